@@ -0,0 +1,8 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Benchmarks for the data pipeline run on synthetic sensor data.
+
+Run them from the top of the repository with ``python -m benchmarks``.
+"""
@@ -0,0 +1,7 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+from .run import runner
+
+runner()
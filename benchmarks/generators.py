@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for creating synthetic sensor data.
+
+The same seed always gives the same data, so results from different
+versions of the package are comparable.
+"""
+
+import csv
+from datetime import datetime, timedelta, timezone
+import pathlib
+from zoneinfo import ZoneInfo
+
+from Adafruit_IO import Data
+import numpy as np
+
+from aio_stats.stats_maker import StatsMaker
+from aio_stats.transform_data_mixin import TransformDataMixin
+
+__all__ = [
+    "DELAY",
+    "FEEDS",
+    "LOCATIONS",
+    "START",
+    "TIMEZONE",
+    "make_data",
+    "make_tree",
+    "write_csv",
+]
+
+# Time between data points in seconds like the sensors.
+DELAY = 300
+# Feeds and the daily mean, daily swing and noise of their values.
+FEEDS = {
+    "temperature": (68.0, 6.0, 0.5),
+    "relative-humidity": (45.0, 10.0, 1.5),
+}
+LOCATIONS = ["Family-Room", "Main-Bedroom", "Office"]
+# The first data point is midnight local time on this day.
+START = datetime(2025, 1, 1, 5, tzinfo=timezone.utc)
+TIMEZONE = "America/New_York"
+# Identifier of the generated feed in the exports.
+FEED_ID = 1000
+
+
+def make_data(
+    num_points: int,
+    feed: str = "temperature",
+    start: datetime = START,
+    seed: int = 0,
+) -> list[Data]:
+    """Create data points like those from Adafruit IO.
+
+    The values follow a daily cycle with noise. The points are oldest
+    first like the data returned by AioClient.
+
+    Parameters
+    ----------
+    num_points : int
+        The number of data points.
+    feed : str, optional
+        The feed used for the value ranges, by default temperature
+    start : datetime, optional
+        The time of the first point, by default START
+    seed : int, optional
+        The seed for the noise, by default 0
+
+    Returns
+    -------
+    list[Data]
+        The data points.
+    """
+    mean, swing, noise = FEEDS[feed]
+    rng = np.random.default_rng(seed)
+    seconds = np.arange(num_points) * DELAY
+    values = (
+        mean
+        + swing * np.sin(2 * np.pi * (seconds / 86400 - 0.375))
+        + rng.normal(0, noise, num_points)
+    ).round(2)
+    return [
+        Data(
+            id=f"{i:026d}",
+            value=str(value),
+            feed_id=FEED_ID,
+            created_at=(start + timedelta(seconds=int(offset))).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            ),
+        )
+        for i, (offset, value) in enumerate(zip(seconds, values))
+    ]
+
+
+def write_csv(outfile: pathlib.Path, data: list[Data]) -> None:
+    """Write data points in the format of the Adafruit IO CSV exports.
+
+    Parameters
+    ----------
+    outfile : pathlib.Path
+        The file to write.
+    data : list[Data]
+        The data points.
+    """
+    with outfile.open("w", newline="") as ofile:
+        writer = csv.writer(ofile)
+        writer.writerow(["id", "value", "feed_id", "created_at", "lat", "lon", "ele"])
+        for x in data:
+            created_at = datetime.fromisoformat(x.created_at)
+            writer.writerow(
+                [
+                    x.id,
+                    x.value,
+                    x.feed_id,
+                    created_at.strftime("%Y-%m-%d %H:%M:%S UTC"),
+                    "",
+                    "",
+                    "",
+                ]
+            )
+
+
+def make_tree(
+    top_level: pathlib.Path,
+    num_days: int,
+    locations: list[str] = LOCATIONS,
+    seed: int = 0,
+) -> None:
+    """Create raw data and statistics trees like collect_stats does.
+
+    Each feed of each location gets the raw day files and the statistics
+    day files under the year/month/day layout. The rollups are made as
+    well when the package supports them.
+
+    Parameters
+    ----------
+    top_level : pathlib.Path
+        Main directory where the data is saved.
+    num_days : int
+        The number of days of data starting at START.
+    locations : list[str], optional
+        The sensor locations, by default LOCATIONS
+    seed : int, optional
+        The seed for the first feed, by default 0
+    """
+    converter = TransformDataMixin()
+    start = START.astimezone(ZoneInfo(TIMEZONE))
+    num_points = num_days * 86400 // DELAY
+    for i, location in enumerate(locations):
+        for j, feed in enumerate(FEEDS):
+            data = make_data(num_points, feed, seed=seed + i * len(FEEDS) + j)
+            stats = StatsMaker()
+            stats.create_dataframe(converter.transform_data(data, TIMEZONE), feed)
+            if hasattr(stats, "save_rollups"):
+                stats.save_rollups(top_level, location)
+            for offset in range(num_days):
+                # filter_time keeps the end time, so stop short of midnight.
+                begin = start + timedelta(days=offset)
+                day = StatsMaker()
+                day.df = stats.df
+                day.filter_time(begin, begin + timedelta(days=1, seconds=-1))
+                day.save_raw(top_level, location)
+                day.make_stats(None)
+                day.save_stats(top_level, location)
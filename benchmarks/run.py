@@ -0,0 +1,138 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import argparse
+from datetime import datetime
+import fnmatch
+from importlib.metadata import PackageNotFoundError, version
+import json
+import pathlib
+import platform
+import tempfile
+
+from .scenarios import SCENARIOS, Workspace, run_scenario
+
+__all__ = ["runner"]
+
+# Number of days of synthetic data for each size.
+SIZES = {"small": 7, "medium": 31, "large": 92}
+
+
+def package_version() -> str:
+    """Return the installed version of the package."""
+    try:
+        return version("aio_stats")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def compare(results: dict, baseline_file: pathlib.Path) -> None:
+    """Print the median times against those of an earlier run.
+
+    Parameters
+    ----------
+    results : dict
+        The results of this run.
+    baseline_file : pathlib.Path
+        The results file of the earlier run.
+    """
+    with baseline_file.open() as ifile:
+        baseline = json.load(ifile)
+    print()
+    print(f"Compared to {baseline['label']} ({baseline['size']}):")
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            print(f"{name:40s} {'new':>10s}")
+            continue
+        ratio = result["median"] / baseline["results"][name]["median"]
+        print(f"{name:40s} {ratio:9.2f}x")
+
+
+def main(opts: argparse.Namespace) -> None:
+    names = [
+        name
+        for name in SCENARIOS
+        if opts.select is None
+        or any(fnmatch.fnmatch(name, pattern) for pattern in opts.select)
+    ]
+
+    results = {
+        "label": opts.label if opts.label is not None else package_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "size": opts.size,
+        "days": SIZES[opts.size],
+        "repeat": opts.repeat,
+        "seed": opts.seed,
+        "results": {},
+        "skipped": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"Creating {SIZES[opts.size]} days of data")
+        workspace = Workspace(pathlib.Path(tmp_dir), SIZES[opts.size], opts.seed)
+        for name in names:
+            result = run_scenario(SCENARIOS[name], workspace, opts.repeat)
+            if result is None:
+                print(f"{name:40s} {'skipped':>10s}")
+                results["skipped"].append(name)
+                continue
+            print(f"{name:40s} {result['median'] * 1000:8.2f}ms")
+            results["results"][name] = result
+
+    if opts.output is not None:
+        with opts.output.expanduser().open("w") as ofile:
+            json.dump(results, ofile, indent=2)
+
+    if opts.compare is not None:
+        compare(results, opts.compare.expanduser())
+
+
+def runner() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the data pipeline on synthetic sensor data."
+    )
+
+    parser.add_argument(
+        "--size",
+        choices=list(SIZES),
+        default="small",
+        help="Amount of synthetic data. Defaults to small.",
+    )
+
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of timed calls per scenario."
+    )
+
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the synthetic data."
+    )
+
+    parser.add_argument(
+        "--select",
+        action="append",
+        help="Only run the scenarios matching this pattern (like data_reader.*). "
+        "Can be given multiple times.",
+    )
+
+    parser.add_argument(
+        "-o", "--output", type=pathlib.Path, help="Write the results to this JSON file."
+    )
+
+    parser.add_argument(
+        "--label",
+        help="Name for the results, like a git revision. Defaults to the "
+        "installed package version.",
+    )
+
+    parser.add_argument(
+        "--compare",
+        type=pathlib.Path,
+        help="Results file from an earlier run to compare the median times with.",
+    )
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,286 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module with the timed benchmark scenarios."""
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import pathlib
+import statistics
+import time
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from aio_stats.aio_file import AioFile
+from aio_stats.data_reader import DataReader
+from aio_stats.stats_maker import StatsMaker
+from aio_stats.transform_data_mixin import TransformDataMixin
+
+from .generators import DELAY, START, TIMEZONE, make_data, make_tree, write_csv
+
+try:
+    import plotly.graph_objects as go
+
+    from aio_stats.plotting import creators
+
+    HAS_PLOTLY = True
+except ImportError:
+    HAS_PLOTLY = False
+
+__all__ = ["SCENARIOS", "Workspace", "run_scenario"]
+
+# The location and feed used by the single feed scenarios.
+LOCATION = "Office"
+FEED = "temperature"
+
+# Scenario names mapped to their setup functions. A setup function gets the
+# workspace and returns the call to time or None if the installed package
+# does not support the scenario.
+SCENARIOS: dict[str, Callable[["Workspace"], Callable[[], Any] | None]] = {}
+
+
+class Workspace:
+
+    def __init__(self, top_level: pathlib.Path, num_days: int, seed: int = 0) -> None:
+        """Class constructor.
+
+        The synthetic data for all the scenarios is created here, so none of
+        it is part of the timings.
+
+        Parameters
+        ----------
+        top_level : pathlib.Path
+            Directory for the generated files.
+        num_days : int
+            The number of days of data.
+        seed : int, optional
+            The seed for the generators, by default 0
+        """
+        self.top_level = top_level
+        self.num_days = num_days
+        self.data = make_data(num_days * 86400 // DELAY, FEED, seed=seed)
+        self.csv_file = top_level / "export.csv"
+        write_csv(self.csv_file, self.data)
+        make_tree(top_level, num_days, seed=seed)
+        self.transformed = TransformDataMixin().transform_data(self.data, TIMEZONE)
+        self.start = START.astimezone(ZoneInfo(TIMEZONE))
+        self.raw_dir = top_level / "raw" / LOCATION / FEED
+        self.stats_dir = top_level / "stats" / LOCATION / FEED
+        self._frames: dict[str, Any] = {}
+
+    def month_dir(self, kind_dir: pathlib.Path) -> pathlib.Path:
+        """Return the directory of the first month."""
+        return kind_dir / str(self.start.year) / f"{self.start.month:02d}"
+
+    def day(self) -> datetime:
+        """Return the start of a day in the middle of the data."""
+        return self.start + timedelta(days=self.num_days // 2)
+
+    def stats_frame(self) -> Any:
+        """Return the first month of statistics as the creators get it."""
+        if "stats" not in self._frames:
+            reader = DataReader(self.month_dir(self.stats_dir))
+            reader.read_month()
+            self._frames["stats"] = reader.table.to_pandas()
+        return self._frames["stats"]
+
+    def locations_frame(self) -> Any:
+        """Return the first month of statistics for all the locations."""
+        if "locations" not in self._frames:
+            reader = DataReader(self.top_level / "stats")
+            reader.read_locations(self.start.year, self.start.month, feeds=[FEED])
+            self._frames["locations"] = reader.table.to_pandas()
+        return self._frames["locations"]
+
+
+def scenario(name: str) -> Callable:
+    """Register a scenario setup function under a name."""
+
+    def decorator(setup: Callable) -> Callable:
+        SCENARIOS[name] = setup
+        return setup
+
+    return decorator
+
+
+def run_scenario(
+    setup: Callable[[Workspace], Callable[[], Any] | None],
+    workspace: Workspace,
+    repeat: int,
+) -> dict[str, Any] | None:
+    """Time a scenario.
+
+    The setup is run before every call, so each call starts from the same
+    state. One untimed call is made first to warm up the code.
+
+    Parameters
+    ----------
+    setup : Callable[[Workspace], Callable[[], Any] | None]
+        The scenario setup function.
+    workspace : Workspace
+        The synthetic data.
+    repeat : int
+        The number of timed calls.
+
+    Returns
+    -------
+    dict[str, Any] | None
+        The call times in seconds with their minimum, median and mean or
+        None if the scenario is not supported.
+    """
+    call = setup(workspace)
+    if call is None:
+        return None
+    call()
+    times = []
+    for _ in range(repeat):
+        call = setup(workspace)
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "times": times,
+    }
+
+
+@scenario("aio_file.read_data")
+def read_data(ws: Workspace) -> Callable[[], Any]:
+    return AioFile(ws.csv_file).read_data
+
+
+@scenario("aio_file.read_table")
+def read_table(ws: Workspace) -> Callable[[], Any] | None:
+    aio_file = AioFile(ws.csv_file)
+    if not hasattr(aio_file, "read_table"):
+        return None
+    return lambda: aio_file.read_table(TIMEZONE)
+
+
+@scenario("aio_file.iter_tables")
+def iter_tables(ws: Workspace) -> Callable[[], Any] | None:
+    aio_file = AioFile(ws.csv_file)
+    if not hasattr(aio_file, "iter_tables"):
+        return None
+    return lambda: list(aio_file.iter_tables(TIMEZONE))
+
+
+@scenario("transform_data")
+def transform_data(ws: Workspace) -> Callable[[], Any]:
+    return lambda: TransformDataMixin().transform_data(ws.data, TIMEZONE)
+
+
+@scenario("transform_data_columnar")
+def transform_data_columnar(ws: Workspace) -> Callable[[], Any] | None:
+    converter = TransformDataMixin()
+    if not hasattr(converter, "transform_data_columnar"):
+        return None
+    return lambda: converter.transform_data_columnar(ws.data, TIMEZONE)
+
+
+@scenario("stats_maker.create_dataframe")
+def create_dataframe(ws: Workspace) -> Callable[[], Any]:
+    stats = StatsMaker()
+    return lambda: stats.create_dataframe(ws.transformed, FEED)
+
+
+@scenario("stats_maker.filter_time")
+def filter_time(ws: Workspace) -> Callable[[], Any]:
+    stats = StatsMaker()
+    stats.create_dataframe(ws.transformed, FEED)
+    begin = ws.day()
+    return lambda: stats.filter_time(begin, begin + timedelta(days=1))
+
+
+@scenario("stats_maker.make_stats")
+def make_stats(ws: Workspace) -> Callable[[], Any]:
+    stats = StatsMaker()
+    stats.create_dataframe(ws.transformed, FEED)
+    begin = ws.day()
+    stats.filter_time(begin, begin + timedelta(days=1))
+    return lambda: stats.make_stats(None)
+
+
+def reader_call(
+    data_dir: pathlib.Path, method: str, *args: Any
+) -> Callable[[], Any] | None:
+    """Return a DataReader read or None if the package does not have it."""
+    reader = DataReader(data_dir)
+    if not hasattr(reader, method) or not data_dir.exists():
+        return None
+    return lambda: getattr(reader, method)(*args)
+
+
+@scenario("data_reader.read_all")
+def read_all(ws: Workspace) -> Callable[[], Any] | None:
+    return reader_call(ws.raw_dir, "read_all")
+
+
+@scenario("data_reader.read_year")
+def read_year(ws: Workspace) -> Callable[[], Any] | None:
+    return reader_call(ws.raw_dir / str(ws.start.year), "read_year")
+
+
+@scenario("data_reader.read_month")
+def read_month(ws: Workspace) -> Callable[[], Any] | None:
+    return reader_call(ws.month_dir(ws.raw_dir), "read_month")
+
+
+@scenario("data_reader.read_day")
+def read_day(ws: Workspace) -> Callable[[], Any] | None:
+    day = ws.day()
+    return reader_call(ws.raw_dir, "read_day", day.year, day.month, day.day)
+
+
+@scenario("data_reader.query")
+def query(ws: Workspace) -> Callable[[], Any] | None:
+    begin = ws.day()
+    return reader_call(ws.raw_dir, "query", begin, begin + timedelta(days=7))
+
+
+@scenario("data_reader.read_locations")
+def read_locations(ws: Workspace) -> Callable[[], Any] | None:
+    return reader_call(
+        ws.top_level / "stats", "read_locations", ws.start.year, ws.start.month
+    )
+
+
+@scenario("data_reader.read_rollups")
+def read_rollups(ws: Workspace) -> Callable[[], Any] | None:
+    return reader_call(
+        ws.top_level / "rollups" / LOCATION / FEED, "read_rollups", "hourly"
+    )
+
+
+def creator_call(name: str, frame: Callable[[], Any]) -> Callable[[], Any] | None:
+    """Return a figure creator call or None if it is not available."""
+    if not HAS_PLOTLY or not hasattr(creators, name):
+        return None
+    df = frame()
+    fig = go.Figure()
+    return lambda: getattr(creators, name)("Temp", fig, df)
+
+
+@scenario("creators.make_stats_trend")
+def make_stats_trend(ws: Workspace) -> Callable[[], Any] | None:
+    return creator_call("make_stats_trend", ws.stats_frame)
+
+
+@scenario("creators.make_min_max_scatter")
+def make_min_max_scatter(ws: Workspace) -> Callable[[], Any] | None:
+    return creator_call("make_min_max_scatter", ws.stats_frame)
+
+
+@scenario("creators.make_min_max_dist")
+def make_min_max_dist(ws: Workspace) -> Callable[[], Any] | None:
+    return creator_call("make_min_max_dist", ws.stats_frame)
+
+
+@scenario("creators.make_location_trend")
+def make_location_trend(ws: Workspace) -> Callable[[], Any] | None:
+    if not hasattr(DataReader, "read_locations"):
+        return None
+    return creator_call("make_location_trend", ws.locations_frame)
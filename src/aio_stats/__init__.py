@@ -5,4 +5,5 @@
 from .aio_client import *
 from .aio_file import *
 from .data_reader import *
+from .stats_accumulator import *
 from .stats_maker import *
@@ -2,29 +2,127 @@
 #
 # SPDX-License-Identifier: MIT
 
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
 import pathlib
+import threading
 import time
 import tomllib
+from typing import Any
+from urllib.parse import parse_qs, urlparse
 
-from Adafruit_IO import Client, Data, Feed, Group
+from Adafruit_IO import Client, Data, Feed, Group, ThrottlingError
 
+from .profiling import profiled, result_size
 from .transform_data_mixin import TransformDataMixin
 
-__all__ = ["AioClient"]
+__all__ = ["AioClient", "DEFAULT_RATE_LIMIT"]
+
+# Largest page size the Adafruit IO data API will return.
+MAX_PAGE_SIZE = 1000
+
+# Requests per minute Adafruit IO allows a free account.
+DEFAULT_RATE_LIMIT = 30.0
+
+# Retries for a throttled request and the first wait in seconds. The wait
+# doubles with each retry.
+MAX_RETRIES = 5
+RETRY_DELAY = 10.0
 
 
 class AioClient(TransformDataMixin):
 
-    def __init__(self, key_file: pathlib.Path = None) -> None:
+    def __init__(
+        self, key_file: pathlib.Path = None, rate_limit: float | None = None
+    ) -> None:
         """Class constructor.
 
         Parameters
         ----------
         key_file : pathlib.Path, optional
             Full path for a file containing the Adafruit IO secret, by default None
+        rate_limit : float | None, optional
+            Maximum number of requests per minute, by default None (no limit)
+
+        Raises
+        ------
+        ValueError
+            If the rate limit is not positive.
+        """
+        if rate_limit is not None and rate_limit <= 0:
+            raise ValueError(f"Rate limit must be positive: {rate_limit}")
+        self.creds = self._get_credentials(key_file)
+        self.rate_limit = rate_limit
+        self._local = threading.local()
+        self._throttle_lock = threading.Lock()
+        self._next_request = 0.0
+
+    @property
+    def client(self) -> Client:
+        """Adafruit IO client for the calling thread.
+
+        The Adafruit IO client keeps the last response around for pagination,
+        so each thread gets its own instance.
         """
-        creds = self._get_credentials(key_file)
-        self.client = Client(creds["AIO_USERNAME"], creds["AIO_KEY"])
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = Client(self.creds["AIO_USERNAME"], self.creds["AIO_KEY"])
+            self._local.client = client
+        return client
+
+    def _throttle(self) -> None:
+        """Wait until another request is allowed by the rate limit."""
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request - now
+            if self.rate_limit is not None:
+                self._next_request = (
+                    max(now, self._next_request) + 60.0 / self.rate_limit
+                )
+        if wait > 0:
+            time.sleep(wait)
+
+    def _back_off(self, delay: float) -> None:
+        """Hold all requests for a while after being throttled.
+
+        Parameters
+        ----------
+        delay : float
+            The time in seconds to hold the requests.
+        """
+        with self._throttle_lock:
+            self._next_request = max(self._next_request, time.monotonic() + delay)
+
+    def _request(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Make an Adafruit IO request, retrying when throttled.
+
+        Parameters
+        ----------
+        method : Callable[..., Any]
+            The client method making the request.
+        *args : Any
+            The positional arguments for the method.
+        **kwargs : Any
+            The keyword arguments for the method.
+
+        Returns
+        -------
+        Any
+            The result of the request.
+
+        Raises
+        ------
+        ThrottlingError
+            If the request is still throttled after all the retries.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            self._throttle()
+            try:
+                return method(*args, **kwargs)
+            except ThrottlingError:
+                if attempt == MAX_RETRIES:
+                    raise
+                self._back_off(RETRY_DELAY * 2**attempt)
 
     def _get_credentials(self, key_file: pathlib.Path) -> dict[str, str]:
         """Parse the Adafruit IO secrets from a file.
@@ -77,6 +175,7 @@ class AioClient(TransformDataMixin):
             print(f"Created feed {a_feed.key}")
             time.sleep(5)
 
+    @profiled("AioClient.fetch_data", result_size)
     def fetch_data(self, feed: str, max_points: int = None) -> list[Data]:
         """Retrieve data from Adafruit IO.
 
@@ -92,7 +191,76 @@ class AioClient(TransformDataMixin):
         list[Data]
             The data points from the feed.
         """
-        data = self.client.data(feed, max_results=max_points)
+        data = self._request(self.client.data, feed, max_results=max_points)
         # Adafruit IO returns newest data first.
         data.reverse()
         return data
+
+    def fetch_range(
+        self, feed: str, start: datetime, end: datetime, page_size: int = MAX_PAGE_SIZE
+    ) -> Iterator[list[Data]]:
+        """Retrieve the data in a time range from Adafruit IO page by page.
+
+        Adafruit IO returns the newest data first, so the pages are yielded
+        from the end of the range towards the start. The data within each
+        page is ordered oldest first.
+
+        Parameters
+        ----------
+        feed : str
+            The feed to retrieve data from.
+        start : datetime
+            The start of the time range (inclusive).
+        end : datetime
+            The end of the time range (exclusive).
+        page_size : int, optional
+            The number of data points to request per page, by default 1000
+
+        Yields
+        ------
+        list[Data]
+            A page of data points from the feed.
+        """
+        path = f"feeds/{feed}/data"
+        params = {
+            "start_time": start.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end_time": end.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "limit": page_size,
+        }
+        while params is not None:
+            response = self._request(self.client._get, path, params=params)
+            page = [Data.from_dict(x) for x in response]
+            # The API end time is inclusive.
+            page = [x for x in page if datetime.fromisoformat(x.created_at) < end]
+            page.reverse()
+            if page:
+                yield page
+            nlink = self.client.get_next_link()
+            params = parse_qs(urlparse(nlink).query) if nlink else None
+
+    @profiled("AioClient.fetch_window", result_size)
+    def fetch_window(self, feed: str, start: datetime, end: datetime) -> list[Data]:
+        """Retrieve all the data in a time range from Adafruit IO.
+
+        All the pages are held in memory before they are returned. Use
+        fetch_range to work through long time ranges a page at a time.
+
+        Parameters
+        ----------
+        feed : str
+            The feed to retrieve data from.
+        start : datetime
+            The start of the time range (inclusive).
+        end : datetime
+            The end of the time range (exclusive).
+
+        Returns
+        -------
+        list[Data]
+            The data points from the feed, oldest first.
+        """
+        pages = list(self.fetch_range(feed, start, end))
+        data = []
+        for page in reversed(pages):
+            data.extend(page)
+        return data
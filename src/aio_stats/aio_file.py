@@ -2,15 +2,23 @@
 #
 # SPDX-License-Identifier: MIT
 
+from collections.abc import Iterator
 import csv
+from datetime import datetime
 import pathlib
 
 from Adafruit_IO import Data
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
 
 from .transform_data_mixin import TransformDataMixin
 
 __all__ = ["AioFile"]
 
+# Format of the created_at column in the Adafruit IO CSV exports.
+CSV_TIME_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+
 
 class AioFile(TransformDataMixin):
 
@@ -41,3 +49,131 @@ class AioFile(TransformDataMixin):
                 )
 
         return data_list
+
+    def _convert_options(self) -> pv.ConvertOptions:
+        """Return the CSV conversion options for the columnar readers."""
+        return pv.ConvertOptions(
+            include_columns=["created_at", "value"],
+            column_types={"created_at": pa.timestamp("s"), "value": pa.float64()},
+            timestamp_parsers=[CSV_TIME_FORMAT],
+        )
+
+    def _to_columns(self, data: pa.Table | pa.RecordBatch, timezone: str) -> pa.Table:
+        """Convert parsed CSV columns to the datetime and value layout.
+
+        Parameters
+        ----------
+        data : pa.Table | pa.RecordBatch
+            The parsed CSV columns.
+        timezone : str
+            Time zone for the timestamp translation.
+
+        Returns
+        -------
+        pa.Table
+            Table with datetime and value columns.
+        """
+        # The exported times are UTC, so attaching the zone only changes the
+        # display of the timestamps.
+        times = data.column("created_at").cast(pa.timestamp("s", tz=timezone))
+        return pa.table({"datetime": times, "value": data.column("value")})
+
+    def read_table(self, timezone: str) -> pa.Table:
+        """Read the CSV file into columns.
+
+        Parameters
+        ----------
+        timezone : str
+            Time zone for the timestamp translation.
+
+        Returns
+        -------
+        pa.Table
+            Table with datetime and value columns.
+        """
+        table = pv.read_csv(
+            self.data_file_path, convert_options=self._convert_options()
+        )
+        return self._to_columns(table, timezone)
+
+    def iter_tables(
+        self, timezone: str, block_size: int | None = None
+    ) -> Iterator[pa.Table]:
+        """Read the CSV file into columns a block at a time.
+
+        Parameters
+        ----------
+        timezone : str
+            Time zone for the timestamp translation.
+        block_size : int | None, optional
+            Number of bytes to read per block, by default None (pyarrow default)
+
+        Yields
+        ------
+        pa.Table
+            Table with datetime and value columns for one block of the file.
+        """
+        read_options = pv.ReadOptions()
+        if block_size is not None:
+            read_options.block_size = block_size
+        with pv.open_csv(
+            self.data_file_path,
+            read_options=read_options,
+            convert_options=self._convert_options(),
+        ) as reader:
+            for batch in reader:
+                yield self._to_columns(batch, timezone)
+
+    def read_range(
+        self,
+        timezone: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        block_size: int | None = None,
+    ) -> pa.Table:
+        """Read the CSV file keeping only the data in a time range.
+
+        The file is read a block at a time, so only the data in the range
+        is held in memory.
+
+        Parameters
+        ----------
+        timezone : str
+            Time zone for the timestamp translation.
+        start : datetime | None, optional
+            The start of the time range (inclusive), by default None
+        end : datetime | None, optional
+            The end of the time range (inclusive like StatsMaker.filter_time),
+            by default None
+        block_size : int | None, optional
+            Number of bytes to read per block, by default None (pyarrow default)
+
+        Returns
+        -------
+        pa.Table
+            Table with datetime and value columns.
+        """
+        tables = []
+        for table in self.iter_tables(timezone, block_size):
+            times = table.column("datetime")
+            if start is not None:
+                table = table.filter(
+                    pc.greater_equal(times, pa.scalar(start, type=times.type))
+                )
+                times = table.column("datetime")
+            if end is not None:
+                table = table.filter(
+                    pc.less_equal(times, pa.scalar(end, type=times.type))
+                )
+            tables.append(table)
+        if not tables:
+            return self._to_columns(
+                pa.table(
+                    {
+                        "created_at": pa.array([], pa.timestamp("s")),
+                        "value": pa.array([], pa.float64()),
+                    }
+                ),
+                timezone,
+            )
+        return pa.concat_tables(tables)
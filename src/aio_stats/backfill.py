@@ -0,0 +1,278 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import argparse
+from collections.abc import Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from datetime import datetime, timedelta
+import os
+import pathlib
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from .aio_client import AioClient
+from .aio_file import AioFile
+from .compact import compact_month
+from .helpers import (
+    MONTH_FILE,
+    Bounds,
+    bounds_from_info,
+    cdleq_to_dict,
+    load_feed_settings,
+    save_bounds_info,
+)
+from .profiling import add_profile_arguments, profile_run
+from .stats_maker import FILE_FORMATS, StatsMaker, process_day
+
+__all__ = ["runner"]
+
+
+def fetch_days(
+    aioclient: AioClient,
+    location: str,
+    feed: str,
+    start: datetime,
+    end: datetime,
+    timezone: str,
+) -> Iterator[StatsMaker]:
+    """Fetch a feed from Adafruit IO a day at a time.
+
+    Adafruit IO returns the newest data first, so a day is complete once a
+    page with older data arrives. Only the oldest day seen so far and the
+    latest page are kept in memory.
+
+    Parameters
+    ----------
+    aioclient : AioClient
+        The Adafruit IO client.
+    location : str
+        Sensor location.
+    feed : str
+        The feed to retrieve data from.
+    start : datetime
+        The start of the time range (inclusive).
+    end : datetime
+        The end of the time range (exclusive).
+    timezone : str
+        Time zone for the data.
+
+    Yields
+    ------
+    StatsMaker
+        Instance holding a single day of the data, newest day first.
+    """
+    pending: pd.DataFrame | None = None
+    for page in aioclient.fetch_range(f"{location}.{feed}", start, end):
+        stats = StatsMaker()
+        stats.create_dataframe(aioclient.transform_data_columnar(page, timezone), feed)
+        if pending is not None:
+            stats.df = pd.concat([stats.df, pending])
+        days = stats.df.index.normalize()
+        pending = stats.df[days == days[0]]
+        stats.df = stats.df[days != days[0]]
+        yield from reversed(list(stats.split_days()))
+    if pending is not None:
+        stats = StatsMaker()
+        stats.df = pending
+        yield from stats.split_days()
+
+
+def feed_days(
+    opts: argparse.Namespace,
+    locations: list[str],
+    start: datetime,
+    end: datetime,
+) -> Iterator[tuple[str, StatsMaker, dict[str, str]]]:
+    """Read the data for all the feeds a day at a time.
+
+    Parameters
+    ----------
+    opts : argparse.Namespace
+        The command-line options.
+    locations : list[str]
+        The sensor locations.
+    start : datetime
+        The start of the time range (inclusive).
+    end : datetime
+        The end of the time range (exclusive).
+
+    Yields
+    ------
+    tuple[str, StatsMaker, dict[str, str]]
+        The location, a single day of data and the bounds information by
+        date for the feed.
+    """
+    if opts.raw_file is not None:
+        for raw_file in opts.raw_file:
+            feed = raw_file.stem.split("-")[0].lower().replace("_", "-")
+            print(f"Reading {raw_file}")
+            client = AioFile(raw_file)
+            tdata = client.read_table(opts.timezone)
+            stats = StatsMaker()
+            stats.create_dataframe(tdata, feed)
+            for day in stats.split_days():
+                yield locations[0], day, {}
+        return
+
+    stat_feeds = load_feed_settings()
+    aioclient = AioClient(rate_limit=opts.rate_limit)
+    for location in locations:
+        settings = stat_feeds["locations"][location]
+        for feed in settings["feeds"]:
+            bound_info = {}
+            # Mainly for autolux
+            bound_feed = settings.get("bounds", {}).get(feed)
+            if bound_feed is not None:
+                bound_data = aioclient.fetch_window(
+                    f"{location}.{bound_feed}", start, end
+                )
+                for items in aioclient.transform_data(bound_data, opts.timezone):
+                    bound_info[items[0].date().isoformat()] = items[1]
+            print(f"Fetching {location}.{feed}")
+            for day in fetch_days(aioclient, location, feed, start, end, opts.timezone):
+                yield location, day, bound_info
+
+
+def main(opts: argparse.Namespace) -> None:
+    zone = ZoneInfo(opts.timezone)
+    start = datetime.strptime(opts.start, "%Y-%m-%d").replace(tzinfo=zone)
+    end = datetime.strptime(opts.end, "%Y-%m-%d").replace(tzinfo=zone)
+    end += timedelta(days=1)
+
+    if opts.location is not None:
+        locations = opts.location
+    else:
+        locations = list(load_feed_settings()["locations"])
+
+    if opts.raw_file is not None and len(locations) != 1:
+        raise ValueError("A single location must be given with raw files.")
+
+    # Days are handed to the pool as they are read. The number waiting is
+    # capped, so the data held stays bounded.
+    max_waiting = 2 * (opts.workers or os.cpu_count() or 1)
+    # Only the ends of each day are kept to find the hours to roll up.
+    day_ends: dict[tuple[str, str], list[pd.DataFrame]] = {}
+    # Workers for the same month would race on its month file, so the
+    # months are compacted once all the days are saved.
+    months: set[pathlib.Path] = set()
+    with ProcessPoolExecutor(max_workers=opts.workers) as executor:
+        futures: set[Future] = set()
+        for location, day, bound_info in feed_days(opts, locations, start, end):
+            if not start <= day.timestamp < end:
+                continue
+            feed = day.df.columns[0]
+            bounds: Bounds | None = None
+            info = bound_info.get(day.timestamp.date().isoformat())
+            if info is not None:
+                bound_set = cdleq_to_dict(info)
+                save_bounds_info(
+                    opts.output_dir, location, feed, day.timestamp, bound_set
+                )
+                bounds = bounds_from_info(bound_set, zone)
+            elif bound_info:
+                print(f"Failed to find bounds for {location}.{feed}")
+            day_ends.setdefault((location, feed), []).append(day.df.iloc[[0, -1]])
+            months.add(
+                pathlib.Path(location, feed, str(day.timestamp.year))
+                / f"{day.timestamp.month:02d}"
+            )
+            if len(futures) >= max_waiting:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    print(f"Processed {future.result()}")
+            futures.add(
+                executor.submit(
+                    process_day,
+                    day,
+                    opts.output_dir,
+                    location,
+                    bounds,
+                    not opts.no_stats,
+                    opts.file_format,
+                    None,
+                )
+            )
+
+        for future in as_completed(futures):
+            print(f"Processed {future.result()}")
+
+    for month in sorted(months):
+        for kind in ["raw", "stats"]:
+            month_dir = opts.output_dir / kind / month
+            if (month_dir / MONTH_FILE).exists():
+                compact_month(month_dir)
+
+    # The rollup files span many days, so they are only written from here.
+    for (location, _), ends in day_ends.items():
+        stats = StatsMaker()
+        stats.df = pd.concat(ends).sort_index()
+        stats.save_rollups(opts.output_dir, location, opts.file_format, from_raw=True)
+
+
+def runner() -> None:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "output_dir", type=pathlib.Path, help="Location for stats output."
+    )
+
+    parser.add_argument("start", help="First date to process in YYYY-MM-DD format.")
+
+    parser.add_argument("end", help="Last date to process in YYYY-MM-DD format.")
+
+    parser.add_argument("--timezone", type=str, help="Set the timezone.")
+
+    parser.add_argument(
+        "--location",
+        action="append",
+        help="Provide a location for the feed data. Can be given multiple times.",
+    )
+
+    parser.add_argument(
+        "--raw-file",
+        type=pathlib.Path,
+        action="append",
+        help="Read the data from an Adafruit IO CSV export instead of fetching it. "
+        "Can be given multiple times. Requires a single location.",
+    )
+
+    parser.add_argument(
+        "--no-stats",
+        action="store_true",
+        help="Only save the raw data.",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        choices=FILE_FORMATS,
+        default="parquet",
+        help="Format of the raw and statistics files.",
+    )
+
+    parser.add_argument(
+        "--workers", type=int, help="Number of processes for the per-day work."
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Maximum number of Adafruit IO requests per minute.",
+    )
+
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+
+    if args.rate_limit is not None and args.rate_limit <= 0:
+        parser.error("--rate-limit must be positive.")
+
+    with profile_run(args):
+        main(args)
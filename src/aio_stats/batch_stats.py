@@ -0,0 +1,312 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import argparse
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .compact import compact_month, write_compacted
+from .data_reader import YEAR_MONTH_PARTITIONING
+from .helpers import MONTH_FILE, load_bounds, load_feed_settings, write_ipc
+from .profiling import add_profile_arguments, profile_run
+from .stats_engine import compute_stats
+from .stats_maker import FILE_FORMATS
+
+__all__ = ["BatchStatsMaker", "runner"]
+
+# Columns of the per-day statistics files.
+STATS_COLUMNS = [
+    "min",
+    "max",
+    "mean",
+    "median",
+    "std",
+    "var",
+    "time_of_min",
+    "time_of_max",
+    "day",
+]
+
+
+class BatchStatsMaker:
+
+    def __init__(
+        self,
+        top_level: pathlib.Path,
+        location: str,
+        feed: str,
+        file_format: str = "parquet",
+    ) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        top_level : pathlib.Path
+            Main directory where the data is saved.
+        location : str
+            Sensor location.
+        feed : str
+            The name of the feed.
+        file_format : str, optional
+            Format of the raw and statistics files, by default parquet.
+            Arrow IPC files are not compacted.
+        """
+        self.top_level = top_level.expanduser()
+        self.location = location
+        self.feed = feed
+        self.file_format = file_format
+        self.times: pd.DatetimeIndex = None
+        self.values: np.ndarray = None
+        self.group_ids: np.ndarray = None
+        self.days: list[tuple[int, int, int]] = []
+        self.stats: pa.Table = None
+
+    def read_raw(self, year: int | None = None, month: int | None = None) -> None:
+        """Read the raw data for the feed.
+
+        Each raw day file becomes a group for the statistics. Compacted
+        month files are split by local day.
+
+        Parameters
+        ----------
+        year : int | None, optional
+            Only read the given year, by default None
+        month : int | None, optional
+            Only read the given month, by default None
+        """
+        raw_dir = self.top_level / "raw" / self.location / self.feed
+        expr = None
+        if year is not None:
+            expr = ds.field("year") == year
+        if month is not None:
+            month_expr = ds.field("month") == month
+            expr = month_expr if expr is None else expr & month_expr
+
+        pieces: dict[tuple[int, int, int], list[pa.Table]] = {}
+        if raw_dir.exists():
+            dataset = ds.dataset(
+                raw_dir,
+                format="ipc" if self.file_format == "arrow" else "parquet",
+                partitioning=YEAR_MONTH_PARTITIONING,
+            )
+            for fragment in dataset.get_fragments(filter=expr):
+                keys = ds.get_partition_keys(fragment.partition_expression)
+                table = fragment.to_table(columns=["datetime", self.feed])
+                name = pathlib.Path(fragment.path).name
+                if name == MONTH_FILE:
+                    # Compacted data is split by local day.
+                    local_days = table.column("datetime").to_pandas().dt.day
+                    for day in np.unique(local_days):
+                        day_key = (keys["year"], keys["month"], int(day))
+                        pieces.setdefault(day_key, []).append(
+                            table.filter((local_days == day).to_numpy())
+                        )
+                else:
+                    day_key = (keys["year"], keys["month"], int(name[:2]))
+                    pieces.setdefault(day_key, []).append(table)
+
+        times = []
+        values = []
+        group_ids = []
+        self.days = sorted(pieces)
+        for group_id, day in enumerate(self.days):
+            for table in pieces[day]:
+                times.append(table.column("datetime").to_pandas())
+                values.append(table.column(self.feed).to_numpy().astype(np.float64))
+                group_ids.append(np.full(table.num_rows, group_id, dtype=np.intp))
+
+        if not self.days:
+            self.times = pd.DatetimeIndex([])
+            self.values = np.array([], dtype=np.float64)
+            self.group_ids = np.array([], dtype=np.intp)
+            return
+
+        self.times = pd.DatetimeIndex(pd.concat(times, ignore_index=True))
+        self.values = np.concatenate(values)
+        self.group_ids = np.concatenate(group_ids)
+
+    def _apply_bounds(self) -> np.ndarray:
+        """Remove data outside the saved bounds of each day.
+
+        Returns
+        -------
+        np.ndarray
+            The values with data outside the bounds set to NaN.
+        """
+        values = self.values.copy()
+        if values.size == 0:
+            return values
+        # Keep the time zone pandas has, which can be a fixed offset.
+        zone = self.times.tz
+        starts = np.searchsorted(self.group_ids, np.arange(len(self.days)))
+        ends = np.r_[starts[1:], self.group_ids.size]
+        for group_id, (year, month, day) in enumerate(self.days):
+            timestamp = pd.Timestamp(year=year, month=month, day=day)
+            bounds = load_bounds(
+                self.top_level, self.location, self.feed, timestamp, zone
+            )
+            if bounds is None:
+                continue
+            if zone is None:
+                # Naive times are local times.
+                bounds = (
+                    bounds[0].replace(tzinfo=None),
+                    bounds[1].replace(tzinfo=None),
+                )
+            begin, end = starts[group_id], ends[group_id]
+            times = self.times[begin:end]
+            outside = (times < bounds[0]) | (times > bounds[1])
+            values[begin:end][outside] = np.nan
+        return values
+
+    def make_stats(self, bounded: bool = False) -> None:
+        """Calculate the statistics for every day at once.
+
+        Parameters
+        ----------
+        bounded : bool, optional
+            Restrict each day to its saved bounds, by default False
+        """
+        values = self._apply_bounds() if bounded else self.values
+        result = compute_stats(values, self.group_ids)
+
+        missing = set(range(len(self.days))) - set(result["group"].tolist())
+        for group_id in sorted(missing):
+            print(f"No data for {self.location}.{self.feed} {self.days[group_id]}")
+
+        days = [self.days[i] for i in result["group"]]
+        stats = {
+            "min": result["min"],
+            "max": result["max"],
+            "mean": result["mean"],
+            "median": result["median"],
+            "std": result["std"],
+            "var": result["var"],
+            "time_of_min": [self.times[i] for i in result["argmin"]],
+            "time_of_max": [self.times[i] for i in result["argmax"]],
+            "day": [x[2] for x in days],
+            "year": [x[0] for x in days],
+            "month": [x[1] for x in days],
+        }
+        self.stats = pa.Table.from_pydict(stats)
+
+    def _month_path(self, year: int, month: int) -> pathlib.Path:
+        """Create the statistics directory for a month."""
+        tpath = (
+            self.top_level
+            / "stats"
+            / self.location
+            / self.feed
+            / str(year)
+            / f"{month:02d}"
+        )
+        tpath.mkdir(parents=True, exist_ok=True)
+        return tpath
+
+    def save_days(self) -> None:
+        """Save the statistics to the per-day files.
+
+        Months that already have a month file are merged into it.
+        """
+        compacted = set()
+        for row in range(self.stats.num_rows):
+            year = self.stats.column("year")[row].as_py()
+            month = self.stats.column("month")[row].as_py()
+            day = self.stats.column("day")[row].as_py()
+            tpath = self._month_path(year, month)
+            outfile = tpath / f"{day:02d}.{self.file_format}"
+            table = self.stats.slice(row, 1).select(STATS_COLUMNS)
+            if self.file_format == "arrow":
+                write_ipc(table, outfile)
+                continue
+            pq.write_table(table, outfile)
+            if (tpath / MONTH_FILE).exists():
+                compacted.add(tpath)
+        for tpath in compacted:
+            compact_month(tpath)
+
+    def save_months(self) -> None:
+        """Save the statistics to a single file per month.
+
+        The per-day files of the month are removed. Only parquet files are
+        written this way.
+        """
+        months = self.stats.select(["year", "month"]).to_pylist()
+        for key in sorted({(x["year"], x["month"]) for x in months}):
+            mask = [(x["year"], x["month"]) == key for x in months]
+            tpath = self._month_path(*key)
+            write_compacted(
+                self.stats.filter(mask).select(STATS_COLUMNS), tpath / MONTH_FILE
+            )
+            for day_file in tpath.glob("[0-9][0-9].parquet"):
+                day_file.unlink()
+
+
+def main(opts: argparse.Namespace) -> None:
+    stat_feeds = load_feed_settings()
+
+    if opts.location is not None:
+        locations = [opts.location]
+    else:
+        locations = list(stat_feeds["locations"])
+
+    for location in locations:
+        settings = stat_feeds["locations"][location]
+        feeds = settings["feeds"] if opts.feed is None else [opts.feed]
+        for feed in feeds:
+            print(f"Processing {location}.{feed}")
+            stats = BatchStatsMaker(opts.top_level, location, feed, opts.file_format)
+            stats.read_raw(opts.year, opts.month)
+            if not stats.days:
+                print(f"No raw data for {location}.{feed}")
+                continue
+            stats.make_stats(feed in settings.get("bounds", {}))
+            if opts.consolidate:
+                stats.save_months()
+            else:
+                stats.save_days()
+
+
+def runner() -> None:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "top_level", type=pathlib.Path, help="Directory containing the raw data."
+    )
+
+    parser.add_argument("--location", help="Only process the given location.")
+
+    parser.add_argument("--feed", help="Only process the given feed.")
+
+    parser.add_argument("--year", type=int, help="Only process the given year.")
+
+    parser.add_argument("--month", type=int, help="Only process the given month.")
+
+    parser.add_argument(
+        "--consolidate",
+        action="store_true",
+        help="Write a single statistics file per month instead of per day.",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        choices=FILE_FORMATS,
+        default="parquet",
+        help="Format of the raw and statistics files.",
+    )
+
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+
+    if args.consolidate and args.file_format != "parquet":
+        parser.error("--consolidate only applies to parquet files.")
+
+    with profile_run(args):
+        main(args)
@@ -3,14 +3,246 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import json
 import pathlib
+from typing import Any
 from zoneinfo import ZoneInfo
 
-from .aio_client import AioClient
-from .helpers import Bounds, cdleq_to_dict, load_feed_settings
-from .stats_maker import StatsMaker
+from Adafruit_IO import Data
+import pyarrow.compute as pc
+
+from .aio_client import DEFAULT_RATE_LIMIT, AioClient
+from .data_reader import DataReader
+from .feed_state import FeedState
+from .helpers import (
+    Bounds,
+    bounds_from_info,
+    cdleq_to_dict,
+    load_feed_settings,
+    save_bounds_info,
+)
+from .profiling import add_profile_arguments, profile_run
+from .stats_maker import FILE_FORMATS, StatsMaker
+
+
+def last_raw_time(
+    top_level: pathlib.Path, location: str, feed: str, file_format: str
+) -> datetime | None:
+    """Return the time of the last saved raw data point for a feed.
+
+    Parameters
+    ----------
+    top_level : pathlib.Path
+        Main directory where the data is saved.
+    location : str
+        Sensor location.
+    feed : str
+        The name of the feed.
+    file_format : str
+        The format of the raw files.
+
+    Returns
+    -------
+    datetime | None
+        The time of the last point or None if there is no raw data.
+    """
+    feed_dir = top_level.expanduser() / "raw" / location / feed
+    for month_dir in sorted(feed_dir.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]"))[::-1]:
+        if not any(month_dir.glob(f"[!.]*.{file_format}")):
+            continue
+        reader = DataReader(month_dir, file_format=file_format)
+        reader.read_month()
+        if reader.table.num_rows > 0:
+            return pc.max(reader.table.column("datetime")).as_py()
+    return None
+
+
+def fetch_feed(
+    aioclient: AioClient,
+    location: str,
+    feed: str,
+    settings: dict[str, Any],
+    opts: argparse.Namespace,
+    now: datetime,
+    start: datetime,
+    end: datetime,
+) -> tuple[list[Data], list[Data] | None]:
+    """Retrieve the data and any bounds data for a feed.
+
+    Parameters
+    ----------
+    aioclient : AioClient
+        The client for retrieving the data.
+    location : str
+        The location of the feed.
+    feed : str
+        The name of the feed.
+    settings : dict[str, Any]
+        The settings for the location.
+    opts : argparse.Namespace
+        The command-line options.
+    now : datetime
+        The current time.
+    start : datetime
+        The start time for the data.
+    end : datetime
+        The end time for the data.
+
+    Returns
+    -------
+    tuple[list[Data], list[Data] | None]
+        The feed data and the bounds data if the feed requires it.
+    """
+    print(f"Processing {location}.{feed}")
+    if opts.incremental:
+        data = aioclient.fetch_window(f"{location}.{feed}", start, end)
+        print(f"Retrieved number of points: {len(data)}")
+        # Bounds are only needed for the statistics.
+        return data, None
+    if opts.window:
+        if opts.day_bound:
+            start = start.replace(hour=0, minute=0, second=0)
+            end = end.replace(hour=0, minute=0, second=0)
+        data = aioclient.fetch_window(f"{location}.{feed}", start, end)
+        print(f"Retrieved number of points: {len(data)}")
+    elif opts.calc_points:
+        delay = settings["delay"]
+        if opts.day_bound:
+            timestamp = start.replace(hour=0, minute=0, second=0)
+        else:
+            timestamp = start
+        max_points = round((now - timestamp) / timedelta(minutes=delay)) + 10
+        print(f"Calculated number of points: {max_points}")
+        data = aioclient.fetch_data(f"{location}.{feed}", max_points=max_points)
+    else:
+        data = aioclient.fetch_data(f"{location}.{feed}", max_points=350)
+
+    bound_data = None
+    # Mainly for autolux
+    bound_feed = settings.get("bounds", {}).get(feed)
+    if bound_feed is not None:
+        bound_data = aioclient.fetch_data(f"{location}.{bound_feed}", max_points=5)
+
+    return data, bound_data
+
+
+def save_feed(
+    aioclient: AioClient,
+    location: str,
+    feed: str,
+    data: list[Data],
+    bound_data: list[Data] | None,
+    opts: argparse.Namespace,
+    yesterday: datetime,
+    end: datetime,
+) -> None:
+    """Save the raw data and statistics for a feed.
+
+    Parameters
+    ----------
+    aioclient : AioClient
+        The client that retrieved the data.
+    location : str
+        The location of the feed.
+    feed : str
+        The name of the feed.
+    data : list[Data]
+        The feed data.
+    bound_data : list[Data] | None
+        The bounds data if the feed requires it.
+    opts : argparse.Namespace
+        The command-line options.
+    yesterday : datetime
+        The start time for the data.
+    end : datetime
+        The end time for the data.
+    """
+    zone = ZoneInfo(opts.timezone)
+    tdata = aioclient.transform_data_columnar(data, opts.timezone)
+    stats = StatsMaker()
+    stats.create_dataframe(tdata, feed)
+    stats.filter_time(yesterday, end, opts.day_bound)
+    stats.save_raw(opts.output_dir, location, opts.compact, opts.file_format)
+    stats.save_rollups(opts.output_dir, location)
+    bounds: Bounds | None = None
+    if bound_data is not None:
+        try:
+            tbound_data = aioclient.transform_data(bound_data, opts.timezone)
+            for items in tbound_data:
+                if items[0].date() == yesterday.date():
+                    bound_info = items[1]
+            bound_set = cdleq_to_dict(bound_info)
+            save_bounds_info(
+                opts.output_dir, location, feed, stats.timestamp, bound_set
+            )
+            bounds = bounds_from_info(bound_set, zone)
+        except UnboundLocalError:
+            print(f"Failed to find bounds for {location}.{feed}")
+        except KeyError:
+            pass
+    stats.make_stats(bounds)
+    stats.save_stats(opts.output_dir, location, opts.compact, opts.file_format)
+
+
+def append_feed(
+    aioclient: AioClient,
+    location: str,
+    feed: str,
+    data: list[Data],
+    opts: argparse.Namespace,
+    state: FeedState,
+    bounded: bool,
+) -> None:
+    """Add newly collected data for a feed to the raw data.
+
+    Feeds without bounds also get their running statistics updated and
+    provisional statistics saved for each day. The provisional statistics
+    go to their own tree, so they never replace the final statistics.
+
+    Parameters
+    ----------
+    aioclient : AioClient
+        The client that retrieved the data.
+    location : str
+        The location of the feed.
+    feed : str
+        The name of the feed.
+    data : list[Data]
+        The feed data.
+    opts : argparse.Namespace
+        The command-line options.
+    state : FeedState
+        The last collected point information for the feeds.
+    bounded : bool
+        Whether the feed statistics require bounds.
+    """
+    feed_key = f"{location}.{feed}"
+    mark = state.get(feed_key)
+    stats = StatsMaker()
+    stats.create_dataframe(aioclient.transform_data_columnar(data, opts.timezone), feed)
+    if mark is not None:
+        stats.df = stats.df.loc[stats.df.index > mark]
+    if stats.df.empty:
+        print(f"No new data for {feed_key}")
+        return
+    for day in stats.split_days():
+        day.append_raw(opts.output_dir, location, opts.compact, opts.file_format)
+        if not bounded:
+            # The day now holds all its saved raw data and the accumulator
+            # skips the points it has already seen.
+            day.accumulate(opts.output_dir, location)
+            day.save_stats(
+                opts.output_dir,
+                location,
+                file_format=opts.file_format,
+                provisional=True,
+            )
+    # Earlier runs can have saved some of the points, so the hours are
+    # rolled up again from the merged raw data.
+    stats.save_rollups(opts.output_dir, location, opts.file_format, from_raw=True)
+    state.update(feed_key, stats.df.index.max().to_pydatetime())
+    state.save()
 
 
 def main(opts: argparse.Namespace) -> None:
@@ -18,9 +250,10 @@ def main(opts: argparse.Namespace) -> None:
     now = datetime.now(zone)
     if opts.old_date is not None:
         yesterday = datetime.strptime(opts.old_date, "%Y-%m-%d").astimezone(zone)
-        new_now = yesterday + timedelta(days=1)
+        end = yesterday + timedelta(days=1)
     else:
         yesterday = now - timedelta(days=1)
+        end = now
 
     stat_feeds = load_feed_settings()
 
@@ -29,65 +262,58 @@ def main(opts: argparse.Namespace) -> None:
     else:
         locations = list(stat_feeds["locations"])
 
-    aioclient = AioClient()
-
-    for location in locations:
-        for feed in stat_feeds["locations"][location]["feeds"]:
-            print(f"Processing {location}.{feed}")
-            if opts.calc_points:
-                delay = stat_feeds["locations"][location]["delay"]
-                if opts.day_bound:
-                    timestamp = yesterday.replace(hour=0, minute=0, second=0)
-                else:
-                    timestamp = yesterday
-                max_points = round((now - timestamp) / timedelta(minutes=delay)) + 10
-                print(f"Calculated number of points: {max_points}")
-            else:
-                max_points = 350
-            data = aioclient.fetch_data(f"{location}.{feed}", max_points=max_points)
-            tdata = aioclient.transform_data(data, opts.timezone)
-            stats = StatsMaker()
-            stats.create_dataframe(tdata, feed)
-            if opts.old_date is not None:
-                stats.filter_time(yesterday, new_now, opts.day_bound)
-            else:
-                stats.filter_time(yesterday, now, opts.day_bound)
-            stats.save_raw(opts.output_dir, location)
-            # Mainly for autolux
-            bounds: Bounds | None = None
-            try:
-                bound_feed = stat_feeds["locations"][location]["bounds"][feed]
-                bound_data = aioclient.fetch_data(
-                    f"{location}.{bound_feed}", max_points=5
-                )
-                tbound_data = aioclient.transform_data(bound_data, opts.timezone)
-                for items in tbound_data:
-                    if items[0].date() == yesterday.date():
-                        bound_info = items[1]
-                bound_set = cdleq_to_dict(bound_info)
-                # Save bounds info
-                ipath = (
-                    opts.output_dir
-                    / "info"
-                    / location
-                    / feed
-                    / str(stats.timestamp.year)
-                    / f"{stats.timestamp.strftime('%m')}"
+    rate_limit = opts.rate_limit
+    if rate_limit is None and opts.workers > 1:
+        rate_limit = DEFAULT_RATE_LIMIT
+    aioclient = AioClient(rate_limit=rate_limit)
+
+    state = None
+    if opts.incremental:
+        if opts.state_file is None:
+            opts.state_file = opts.output_dir / "collect_state.json"
+        state = FeedState(opts.state_file)
+
+    with ThreadPoolExecutor(max_workers=opts.workers) as executor:
+        futures = {}
+        for location in locations:
+            settings = stat_feeds["locations"][location]
+            for feed in settings["feeds"]:
+                start = yesterday
+                if opts.incremental:
+                    start = state.get(f"{location}.{feed}")
+                if opts.incremental and start is None:
+                    # Start where the saved raw data ends and mark it, so the
+                    # points the nightly run has saved are skipped.
+                    start = last_raw_time(
+                        opts.output_dir, location, feed, opts.file_format
+                    )
+                    if start is not None:
+                        state.update(f"{location}.{feed}", start)
+                    else:
+                        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+                future = executor.submit(
+                    fetch_feed,
+                    aioclient,
+                    location,
+                    feed,
+                    settings,
+                    opts,
+                    now,
+                    start,
+                    end,
                 )
-                ipath.mkdir(parents=True, exist_ok=True)
-                outfile = ipath / f"{stats.timestamp.strftime('%d')}.json"
-                with outfile.open("w") as ofile:
-                    json.dump(bound_set, ofile)
-                bounds = (
-                    datetime.fromtimestamp(bound_set["sunrise"]).astimezone(zone),
-                    datetime.fromtimestamp(bound_set["on"]).astimezone(zone),
+                futures[future] = (location, feed)
+
+        for future in as_completed(futures):
+            location, feed = futures[future]
+            data, bound_data = future.result()
+            if opts.incremental:
+                bounded = feed in stat_feeds["locations"][location].get("bounds", {})
+                append_feed(aioclient, location, feed, data, opts, state, bounded)
+            else:
+                save_feed(
+                    aioclient, location, feed, data, bound_data, opts, yesterday, end
                 )
-            except UnboundLocalError:
-                print(f"Failed to find bounds for {location}.{feed}")
-            except KeyError:
-                pass
-            stats.make_stats(bounds)
-            stats.save_stats(opts.output_dir, location)
 
 
 def runner() -> None:
@@ -117,6 +343,64 @@ def runner() -> None:
         "--old-date", type=str, help="Get data from prior date. Format of YYYY-MM-DD."
     )
 
+    parser.add_argument(
+        "--window",
+        action="store_true",
+        help="Fetch exactly the requested time range instead of a number of points.",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch data newer than the last run and add it to the raw data. "
+        "The first run starts after the last saved raw data point or at the "
+        "start of the current day. Provisional statistics are saved under "
+        "provisional for feeds without bounds.",
+    )
+
+    parser.add_argument(
+        "--state-file",
+        type=pathlib.Path,
+        help="File tracking the last collected points for incremental mode. "
+        "Defaults to collect_state.json in the output directory.",
+    )
+
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Keep the data in a single file per month.",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        choices=FILE_FORMATS,
+        default="parquet",
+        help="Format of the raw and statistics files. Arrow IPC files are "
+        "uncompressed and memory mapped by the readers.",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of feeds to fetch from Adafruit IO concurrently.",
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        help="Maximum number of Adafruit IO requests per minute. Defaults to "
+        f"{DEFAULT_RATE_LIMIT:g} when fetching with more than one worker.",
+    )
+
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
-    main(args)
+    if args.compact and args.file_format != "parquet":
+        parser.error("--compact only applies to parquet files.")
+    if args.rate_limit is not None and args.rate_limit <= 0:
+        parser.error("--rate-limit must be positive.")
+
+    with profile_run(args):
+        main(args)
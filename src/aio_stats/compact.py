@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import argparse
+import os
+import pathlib
+import uuid
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .helpers import MONTH_FILE, load_feed_settings
+from .profiling import add_profile_arguments, profile_run
+
+__all__ = ["compact_month", "runner", "write_compacted"]
+
+# Largest row group. Data with a datetime column gets a row group per local
+# day, so queries on compacted months can still skip whole days.
+ROW_GROUP_SIZE = 65536
+
+
+def day_slices(table: pa.Table) -> list[pa.Table]:
+    """Split a table sorted by time into local days.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The data. Tables without a datetime column are not split.
+
+    Returns
+    -------
+    list[pa.Table]
+        The data of each day in order.
+    """
+    if "datetime" not in table.column_names or table.num_rows == 0:
+        return [table]
+    times = table.column("datetime").to_pandas().dt
+    days = (times.year * 10000 + times.month * 100 + times.day).to_numpy()
+    bounds = np.r_[0, np.flatnonzero(days[1:] != days[:-1]) + 1, days.size]
+    return [table.slice(begin, end - begin) for begin, end in zip(bounds, bounds[1:])]
+
+
+def write_compacted(table: pa.Table, outfile: pathlib.Path) -> None:
+    """Write a table with the settings for compacted files.
+
+    Timestamp columns use delta encoding and the other columns use
+    dictionary encoding. Data with a datetime column is written a row group
+    per day. The file is written to a unique temporary file next to the
+    final name and moved into place, so readers never see a partial file.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The data to write.
+    outfile : pathlib.Path
+        The file to write.
+    """
+    time_columns = [
+        field.name for field in table.schema if pa.types.is_timestamp(field.type)
+    ]
+    other_columns = [name for name in table.column_names if name not in time_columns]
+    tmp_file = outfile.with_name(f".{outfile.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with pq.ParquetWriter(
+            tmp_file,
+            table.schema,
+            compression="zstd",
+            use_dictionary=other_columns,
+            column_encoding={name: "DELTA_BINARY_PACKED" for name in time_columns},
+        ) as writer:
+            for piece in day_slices(table):
+                writer.write_table(piece, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_file, outfile)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+
+def compact_month(month_dir: pathlib.Path) -> pathlib.Path | None:
+    """Merge the day files of a month directory into a single file.
+
+    Any existing month file is merged as well. The data is sorted by time
+    (by day for statistics) and when the same time appears more than once
+    the data from the day files wins. The day files are removed afterwards
+    unless they have changed since they were read. The month must not be
+    written by another process while it is compacted.
+
+    Parameters
+    ----------
+    month_dir : pathlib.Path
+        The month directory to compact.
+
+    Returns
+    -------
+    pathlib.Path | None
+        The month file or None if there were no day files.
+    """
+    day_files = sorted(month_dir.glob("[0-9][0-9].parquet"))
+    if not day_files:
+        return None
+
+    month_file = month_dir / MONTH_FILE
+    tables = []
+    if month_file.exists():
+        tables.append(pq.read_table(month_file))
+    # A day file written again after it was read keeps its new data.
+    merged = {}
+    for day_file in day_files:
+        merged[day_file] = day_file.stat().st_mtime_ns
+        tables.append(pq.read_table(day_file))
+    table = pa.concat_tables(tables, promote_options="permissive")
+
+    key = "datetime" if "datetime" in table.column_names else "day"
+    # Sorting is stable, so the later tables stay last among duplicates.
+    table = table.take(pc.sort_indices(table, sort_keys=[(key, "ascending")]))
+    if table.num_rows > 0:
+        keys = table.column(key).to_numpy()
+        table = table.filter(np.r_[keys[1:] != keys[:-1], True])
+
+    write_compacted(table, month_file)
+    for day_file, mtime in merged.items():
+        if day_file.stat().st_mtime_ns == mtime:
+            day_file.unlink()
+    return month_file
+
+
+def main(opts: argparse.Namespace) -> None:
+    stat_feeds = load_feed_settings()
+
+    if opts.location is not None:
+        locations = [opts.location]
+    else:
+        locations = list(stat_feeds["locations"])
+
+    year_glob = "[0-9][0-9][0-9][0-9]" if opts.year is None else str(opts.year)
+    month_glob = "[0-9][0-9]" if opts.month is None else f"{opts.month:02d}"
+
+    for kind in opts.kind:
+        for location in locations:
+            for feed in stat_feeds["locations"][location]["feeds"]:
+                feed_dir = opts.top_level.expanduser() / kind / location / feed
+                for month_dir in sorted(feed_dir.glob(f"{year_glob}/{month_glob}")):
+                    month_file = compact_month(month_dir)
+                    if month_file is not None:
+                        print(f"Compacted {month_file}")
+
+
+def runner() -> None:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "top_level", type=pathlib.Path, help="Directory containing the data."
+    )
+
+    parser.add_argument(
+        "--kind",
+        choices=["raw", "stats"],
+        action="append",
+        help="Type of data to compact. Can be given multiple times. "
+        "Defaults to both.",
+    )
+
+    parser.add_argument("--location", help="Only compact the given location.")
+
+    parser.add_argument("--year", type=int, help="Only compact the given year.")
+
+    parser.add_argument("--month", type=int, help="Only compact the given month.")
+
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+
+    if args.kind is None:
+        args.kind = ["raw", "stats"]
+
+    with profile_run(args):
+        main(args)
@@ -5,6 +5,7 @@
 import argparse
 
 from .aio_client import AioClient
+from .profiling import add_profile_arguments, profile_run
 
 FEEDS = {
     "temp_rh": [
@@ -55,6 +56,9 @@ def runner() -> None:
         "--prefix", type=str, help="Set a prefix for the battery related feeds."
     )
 
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
-    main(args)
+    with profile_run(args):
+        main(args)
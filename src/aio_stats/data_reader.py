@@ -2,34 +2,178 @@
 #
 # SPDX-License-Identifier: MIT
 
+from collections.abc import Callable, Hashable
+from datetime import datetime, timedelta
 import pathlib
+from zoneinfo import ZoneInfo
 
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.dataset as ds
+import pyarrow.fs as pafs
 import pyarrow.parquet as pq
 
+from .helpers import MONTH_FILE, read_ipc
+from .profiling import attribute_size, profiled
+from .rollups import ROLLUP_GRANULARITIES
+from .table_cache import TABLE_CACHE
+
 __all__ = ["DataReader"]
 
+# Directory layout of the data below a feed.
+YEAR_MONTH_PARTITIONING = ds.partitioning(
+    pa.schema([("year", pa.int32()), ("month", pa.int32())])
+)
+
+# Directory layout of the data below a data type (raw or stats).
+LOCATION_PARTITIONING = ds.partitioning(
+    pa.schema(
+        [
+            ("location", pa.string()),
+            ("feed", pa.string()),
+            ("year", pa.int32()),
+            ("month", pa.int32()),
+        ]
+    )
+)
+
+# Arrow IPC files are opened as memory maps, so their data is not copied.
+MMAP_FILESYSTEM = pafs.LocalFileSystem(use_mmap=True)
+
 
 class DataReader:
 
-    def __init__(self, data_dir: pathlib.Path) -> None:
+    def __init__(
+        self,
+        data_dir: pathlib.Path,
+        use_cache: bool = False,
+        file_format: str = "parquet",
+    ) -> None:
         """Class constructor.
 
         Parameters
         ----------
         data_dir : pathlib.Path
             Directory containing the structure data.
+        use_cache : bool, optional
+            Keep the tables read in the process-wide cache, by default False
+        file_format : str, optional
+            Format of the data files, by default parquet. Arrow IPC files
+            (arrow) are memory mapped instead of read into memory.
         """
         self.data_dir = data_dir.expanduser()
+        self.use_cache = use_cache
+        self.file_format = file_format
+
+    def _dataset(
+        self,
+        partitioning: ds.Partitioning | None = None,
+        data_files: list[pathlib.Path] | None = None,
+    ) -> ds.Dataset:
+        """Return the data files below the directory as a dataset.
+
+        Parameters
+        ----------
+        partitioning : ds.Partitioning | None, optional
+            The directory partitioning, by default None
+        data_files : list[pathlib.Path] | None, optional
+            Only use these files below the directory, by default None (all)
+
+        Returns
+        -------
+        ds.Dataset
+            The dataset.
+        """
+        top = self.data_dir.resolve()
+        if data_files is None:
+            source = str(top)
+            base_dir = None
+        else:
+            source = [str(data_file.resolve()) for data_file in data_files]
+            base_dir = str(top)
+        if self.file_format == "arrow":
+            return ds.dataset(
+                source,
+                format="ipc",
+                partitioning=partitioning,
+                partition_base_dir=base_dir,
+                filesystem=MMAP_FILESYSTEM,
+            )
+        return ds.dataset(
+            source,
+            format="parquet",
+            partitioning=partitioning,
+            partition_base_dir=base_dir,
+        )
+
+    def _read_tree(self, partitioning: ds.Partitioning | None = None) -> pa.Table:
+        """Read all the data files below the directory."""
+        if self.file_format == "arrow":
+            return self._dataset(partitioning).to_table()
+        if partitioning is None:
+            return pq.read_table(self.data_dir)
+        return pq.read_table(self.data_dir, partitioning=partitioning)
+
+    @staticmethod
+    def _subdirs(top: pathlib.Path, depth: int) -> list[pathlib.Path]:
+        """Return the numbered directories a number of levels below a directory."""
+        return sorted(
+            path for path in top.glob("/".join(["[0-9]*"] * depth)) if path.is_dir()
+        )
+
+    def _read(
+        self,
+        key: Hashable,
+        sources: list[pathlib.Path],
+        loader: Callable[[], pa.Table],
+    ) -> pa.Table:
+        """Read a table, going through the cache if enabled.
+
+        A cached table is only used if none of the data files of the sources
+        have been written, added or removed since it was read.
 
+        Parameters
+        ----------
+        key : Hashable
+            Identifier of the read.
+        sources : list[pathlib.Path]
+            The files and the directories (not their subdirectories) the
+            table is read from.
+        loader : Callable[[], pa.Table]
+            Function that reads the table.
+
+        Returns
+        -------
+        pa.Table
+            The data.
+        """
+        if not self.use_cache:
+            return loader()
+        key = (str(self.data_dir), key)
+        fingerprint = TABLE_CACHE.fingerprint(sources)
+        table = TABLE_CACHE.get(key, fingerprint)
+        if table is None:
+            table = loader()
+            TABLE_CACHE.put(key, fingerprint, table)
+        return table
+
+    @profiled("DataReader.read_all", attribute_size("table"))
     def read_all(self) -> None:
         """Read all data from directory."""
         p = ds.partitioning(field_names=["year", "month"])
-        self.table = pq.read_table(self.data_dir, partitioning=p)
+        self.table = self._read(
+            "all",
+            self._subdirs(self.data_dir, 2),
+            lambda: self._read_tree(p),
+        )
 
+    @profiled("DataReader.read_day", attribute_size("table"))
     def read_day(self, year: int, month: int, day: int) -> None:
         """Read a specific day file.
 
+        Data for the day in a compacted month file is included. Arrow IPC
+        files are not compacted.
+
         Parameters
         ----------
         year : int
@@ -39,14 +183,236 @@ class DataReader:
         day : int
             Day to fetch.
         """
-        infile = self.data_dir / f"{year}" / f"{month:02d}" / f"{day:02d}.parquet"
-        self.table = pq.read_table(infile)
+        month_dir = self.data_dir / f"{year}" / f"{month:02d}"
+        self.table = self._read(
+            ("day", year, month, day),
+            [month_dir / f"{day:02d}.{self.file_format}", month_dir / MONTH_FILE],
+            lambda: self._load_day(month_dir, day),
+        )
+
+    def _load_day(self, month_dir: pathlib.Path, day: int) -> pa.Table:
+        """Read a day from the day file and the month file."""
+        if self.file_format == "arrow":
+            return read_ipc(month_dir / f"{day:02d}.arrow")
+        infile = month_dir / f"{day:02d}.parquet"
+        month_file = month_dir / MONTH_FILE
+        if not month_file.exists():
+            return pq.read_table(infile)
 
+        table = pq.read_table(month_file)
+        if "datetime" in table.column_names:
+            local_days = table.column("datetime").to_pandas().dt.day.to_numpy()
+            table = table.filter(local_days == day)
+        else:
+            table = table.filter(pc.equal(table.column("day"), day))
+        if infile.exists():
+            table = pa.concat_tables(
+                [table, pq.read_table(infile)], promote_options="permissive"
+            )
+        return table
+
+    @profiled("DataReader.read_month", attribute_size("table"))
     def read_month(self) -> None:
-        """Read data from specific month."""
-        self.table = pq.read_table(self.data_dir)
+        """Read data from specific month.
+
+        The month can have day files, a compacted month file or both.
+        """
+        self.table = self._read("month", [self.data_dir], self._load_month)
+
+    def _load_month(self) -> pa.Table:
+        """Read the day files and the month file of a month directory.
+
+        Data in both a day file and the month file is taken from the day
+        file like compact_month does. Arrow IPC files are not compacted.
+        """
+        month_file = self.data_dir / MONTH_FILE
+        if self.file_format == "arrow" or not month_file.exists():
+            return self._read_tree()
+        day_files = sorted(self.data_dir.glob("[0-9][0-9].parquet"))
+        table = pq.read_table(month_file)
+        if not day_files:
+            return table
+
+        days = pa.concat_tables(
+            [pq.read_table(day_file) for day_file in day_files],
+            promote_options="permissive",
+        )
+        key = "datetime" if "datetime" in table.column_names else "day"
+        saved = pc.is_in(table.column(key), value_set=days.column(key).combine_chunks())
+        table = pa.concat_tables(
+            [table.filter(pc.invert(saved)), days], promote_options="permissive"
+        )
+        return table.sort_by(key)
 
+    @profiled("DataReader.read_year", attribute_size("table"))
     def read_year(self) -> None:
         """Read data from specific year."""
         p = ds.partitioning(field_names=["month"])
-        self.table = pq.read_table(self.data_dir, partitioning=p)
+        self.table = self._read(
+            "year",
+            self._subdirs(self.data_dir, 1),
+            lambda: self._read_tree(p),
+        )
+
+    @profiled("DataReader.query", attribute_size("table"))
+    def query(
+        self, start: datetime, end: datetime, columns: list[str] | None = None
+    ) -> None:
+        """Read data from a time range.
+
+        The directory must be the top of a feed's year/month tree. Only the
+        month directories overlapping the range are opened and the parquet
+        row group statistics skip the rest of the data. Statistics files,
+        which have no datetime column, are selected by day: every day the
+        range overlaps is included, so a range ending partway through a day
+        includes that day.
+
+        Parameters
+        ----------
+        start : datetime
+            The start of the time range (inclusive).
+        end : datetime
+            The end of the time range (exclusive).
+        columns : list[str] | None, optional
+            The columns to read, by default None (all columns)
+        """
+        dataset = self._dataset(YEAR_MONTH_PARTITIONING)
+        schema = dataset.schema
+
+        if "datetime" in schema.names:
+            time_type = schema.field("datetime").type
+            if time_type.tz is not None:
+                start = start.astimezone(ZoneInfo(time_type.tz))
+                end = end.astimezone(ZoneInfo(time_type.tz))
+            times = ds.field("datetime")
+            row_filter = (times >= pa.scalar(start, type=time_type)) & (
+                times < pa.scalar(end, type=time_type)
+            )
+            # A day file can hold data running into the next day.
+            first = start - timedelta(days=1)
+        else:
+            day_key = (
+                ds.field("year") * 10000 + ds.field("month") * 100 + ds.field("day")
+            )
+            # An end at midnight does not overlap the day it starts.
+            last = end - timedelta(microseconds=1)
+            row_filter = (
+                day_key >= start.year * 10000 + start.month * 100 + start.day
+            ) & (day_key <= last.year * 10000 + last.month * 100 + last.day)
+            first = start
+
+        year = ds.field("year")
+        month = ds.field("month")
+        partition_filter = (
+            (year > first.year) | ((year == first.year) & (month >= first.month))
+        ) & ((year < end.year) | ((year == end.year) & (month <= end.month)))
+
+        months = [
+            month_dir
+            for month_dir in self._subdirs(self.data_dir, 2)
+            if (first.year, first.month)
+            <= (int(month_dir.parent.name), int(month_dir.name))
+            <= (end.year, end.month)
+        ]
+        self.table = self._read(
+            ("query", start, end, tuple(columns) if columns is not None else None),
+            months,
+            lambda: dataset.to_table(
+                columns=columns, filter=partition_filter & row_filter
+            ),
+        )
+
+    @profiled("DataReader.read_locations", attribute_size("table"))
+    def read_locations(
+        self,
+        year: int,
+        month: int,
+        locations: list[str] | None = None,
+        feeds: list[str] | None = None,
+    ) -> None:
+        """Read a month of statistics for many locations in one scan.
+
+        The directory must be the top of the statistics tree. Only the month
+        directories asked for are listed and they are read as one dataset.
+        The table has location, feed, year and month columns.
+
+        Parameters
+        ----------
+        year : int
+            Year to fetch.
+        month : int
+            Month to fetch.
+        locations : list[str] | None, optional
+            The locations to read, by default None (all)
+        feeds : list[str] | None, optional
+            The feeds to read, by default None (all)
+        """
+        data_files = []
+        for month_dir in sorted(self.data_dir.glob(f"*/*/{year}/{month:02d}")):
+            location, feed = month_dir.parts[-4:-2]
+            if locations is not None and location not in locations:
+                continue
+            if feeds is not None and feed not in feeds:
+                continue
+            data_files.extend(
+                data_file
+                for data_file in sorted(month_dir.iterdir())
+                if data_file.suffix == f".{self.file_format}"
+                and not data_file.name.startswith(".")
+            )
+
+        key = (
+            "locations",
+            year,
+            month,
+            tuple(locations) if locations is not None else None,
+            tuple(feeds) if feeds is not None else None,
+        )
+        self.table = self._read(
+            key,
+            data_files,
+            lambda: self._dataset(LOCATION_PARTITIONING, data_files).to_table(),
+        )
+
+    @profiled("DataReader.read_rollups", attribute_size("table"))
+    def read_rollups(
+        self,
+        granularity: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> None:
+        """Read the rollups of a feed.
+
+        The directory must be the rollups directory of a feed.
+
+        Parameters
+        ----------
+        granularity : str
+            The period of the rollups: hourly, daily or monthly.
+        start : datetime | None, optional
+            The earliest period start (inclusive), by default None
+        end : datetime | None, optional
+            The latest period start (exclusive), by default None
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        source = self.data_dir / granularity
+        if granularity == "monthly":
+            source = source.with_suffix(".parquet")
+        sources = self._subdirs(source, 1) if granularity == "hourly" else [source]
+
+        def loader() -> pa.Table:
+            dataset = ds.dataset(source, format="parquet")
+            period_type = dataset.schema.field("period").type
+            row_filter = None
+            if start is not None:
+                row_filter = ds.field("period") >= pa.scalar(start, type=period_type)
+            if end is not None:
+                end_filter = ds.field("period") < pa.scalar(end, type=period_type)
+                row_filter = (
+                    end_filter if row_filter is None else row_filter & end_filter
+                )
+            table = dataset.to_table(filter=row_filter)
+            return table.sort_by("period")
+
+        self.table = self._read(("rollups", granularity, start, end), sources, loader)
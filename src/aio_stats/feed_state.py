@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for tracking the last collected point of each feed."""
+
+from datetime import datetime
+import json
+import pathlib
+
+__all__ = ["FeedState"]
+
+
+class FeedState:
+
+    def __init__(self, state_file: pathlib.Path) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        state_file : pathlib.Path
+            File containing the state information.
+        """
+        self.state_file = state_file.expanduser()
+        self.marks: dict[str, str] = {}
+        if self.state_file.exists():
+            with self.state_file.open() as ifile:
+                self.marks = json.load(ifile)
+
+    def get(self, feed: str) -> datetime | None:
+        """Return the time of the last collected point for a feed.
+
+        Parameters
+        ----------
+        feed : str
+            The full feed key (location.feed).
+
+        Returns
+        -------
+        datetime | None
+            The time of the last point or None if the feed has not been seen.
+        """
+        mark = self.marks.get(feed)
+        if mark is None:
+            return None
+        return datetime.fromisoformat(mark)
+
+    def update(self, feed: str, timestamp: datetime) -> None:
+        """Set the time of the last collected point for a feed.
+
+        Parameters
+        ----------
+        feed : str
+            The full feed key (location.feed).
+        timestamp : datetime
+            The time of the last point.
+        """
+        self.marks[feed] = timestamp.isoformat()
+
+    def save(self) -> None:
+        """Write the state information to file."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with tmp_file.open("w") as ofile:
+            json.dump(self.marks, ofile, indent=2)
+        tmp_file.replace(self.state_file)
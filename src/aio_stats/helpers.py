@@ -4,15 +4,35 @@
 
 """Module for common stuff."""
 
-from datetime import datetime
+from datetime import datetime, tzinfo
 from importlib.resources import files
+import json
+import os
+import pathlib
 import tomllib
 from typing import Any
 
-__all__ = ["Bounds", "cdleq_to_dict", "load_feed_settings"]
+import pyarrow as pa
+
+__all__ = [
+    "MONTH_FILE",
+    "Bounds",
+    "atomic_write_text",
+    "bounds_from_info",
+    "cdleq_to_dict",
+    "load_bounds",
+    "load_bounds_info",
+    "load_feed_settings",
+    "read_ipc",
+    "save_bounds_info",
+    "write_ipc",
+]
 
 Bounds = tuple[datetime, datetime]
 
+# Name of the file holding a whole month of data in a month directory.
+MONTH_FILE = "month.parquet"
+
 
 def cdleq_to_dict(items: str) -> dict[str, str | float]:
     """Parse comma-delimited list with equals items.
@@ -56,3 +76,188 @@ def load_feed_settings() -> dict[str, Any]:
     stat_feeds_file = files("aio_stats.data").joinpath("stat_feeds.toml")
     stat_feeds = tomllib.loads(stat_feeds_file.read_text())
     return stat_feeds
+
+
+def bounds_from_info(bound_set: dict[str, str | float], zone: tzinfo) -> Bounds:
+    """Create the time bounds from the bounds information.
+
+    Parameters
+    ----------
+    bound_set : dict[str, str | float]
+        The bounds information containing sunrise and on timestamps.
+    zone : tzinfo
+        The time zone for the bounds.
+
+    Returns
+    -------
+    Bounds
+        The start and end times of the bounds.
+    """
+    return (
+        datetime.fromtimestamp(bound_set["sunrise"]).astimezone(zone),
+        datetime.fromtimestamp(bound_set["on"]).astimezone(zone),
+    )
+
+
+def _bounds_info_file(
+    top_level: pathlib.Path, location: str, feed: str, timestamp: datetime
+) -> pathlib.Path:
+    """Return the file name for the bounds information of a day."""
+    return (
+        top_level
+        / "info"
+        / location
+        / feed
+        / str(timestamp.year)
+        / f"{timestamp.strftime('%m')}"
+        / f"{timestamp.strftime('%d')}.json"
+    )
+
+
+def load_bounds_info(
+    top_level: pathlib.Path, location: str, feed: str, timestamp: datetime
+) -> dict[str, str | float] | None:
+    """Read the bounds information from file.
+
+    Parameters
+    ----------
+    top_level : pathlib.Path
+        Main directory where the data is saved.
+    location : str
+        Sensor location.
+    feed : str
+        The name of the feed the bounds apply to.
+    timestamp : datetime
+        The day for the bounds.
+
+    Returns
+    -------
+    dict[str, str | float] | None
+        The bounds information or None if there is no file for the day.
+    """
+    infile = _bounds_info_file(top_level, location, feed, timestamp)
+    if not infile.exists():
+        return None
+    with infile.open() as ifile:
+        return json.load(ifile)
+
+
+def load_bounds(
+    top_level: pathlib.Path,
+    location: str,
+    feed: str,
+    timestamp: datetime,
+    zone: tzinfo,
+) -> Bounds | None:
+    """Read the time bounds of a day from the saved bounds information.
+
+    Parameters
+    ----------
+    top_level : pathlib.Path
+        Main directory where the data is saved.
+    location : str
+        Sensor location.
+    feed : str
+        The name of the feed the bounds apply to.
+    timestamp : datetime
+        The day for the bounds.
+    zone : tzinfo
+        The time zone for the bounds.
+
+    Returns
+    -------
+    Bounds | None
+        The start and end times of the bounds or None if there is no file
+        for the day.
+    """
+    bound_set = load_bounds_info(top_level, location, feed, timestamp)
+    if bound_set is None:
+        return None
+    return bounds_from_info(bound_set, zone)
+
+
+def save_bounds_info(
+    top_level: pathlib.Path,
+    location: str,
+    feed: str,
+    timestamp: datetime,
+    bound_set: dict[str, str | float],
+) -> None:
+    """Save the bounds information to file.
+
+    Parameters
+    ----------
+    top_level : pathlib.Path
+        Main directory where the data should be saved.
+    location : str
+        Sensor location.
+    feed : str
+        The name of the feed the bounds apply to.
+    timestamp : datetime
+        The day for the bounds.
+    bound_set : dict[str, str | float]
+        The bounds information.
+    """
+    outfile = _bounds_info_file(top_level, location, feed, timestamp)
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    with outfile.open("w") as ofile:
+        json.dump(bound_set, ofile)
+
+
+def atomic_write_text(outfile: pathlib.Path, text: str) -> None:
+    """Write a text file so readers never see a partial file.
+
+    The text is written next to the final name and moved into place.
+
+    Parameters
+    ----------
+    outfile : pathlib.Path
+        The file to write.
+    text : str
+        The contents of the file.
+    """
+    tmp_file = outfile.with_name(f".{outfile.name}.tmp")
+    tmp_file.write_text(text, encoding="utf-8")
+    os.replace(tmp_file, outfile)
+
+
+def read_ipc(infile: pathlib.Path) -> pa.Table:
+    """Read an Arrow IPC file through a memory map.
+
+    The columns of the table point into the mapped file, so no data is
+    copied and processes reading the same file share its pages. The map is
+    not closed here. The buffers of the table keep it open and it is
+    released once the table is no longer used.
+
+    Parameters
+    ----------
+    infile : pathlib.Path
+        The file to read.
+
+    Returns
+    -------
+    pa.Table
+        The data.
+    """
+    source = pa.memory_map(str(infile))
+    return pa.ipc.open_file(source).read_all()
+
+
+def write_ipc(table: pa.Table, outfile: pathlib.Path) -> None:
+    """Write an uncompressed Arrow IPC file.
+
+    The file is written next to the final name and moved into place, so
+    processes that have the old file memory mapped keep a valid mapping.
+
+    Parameters
+    ----------
+    table : pa.Table
+        The data to write.
+    outfile : pathlib.Path
+        The file to write.
+    """
+    tmp_file = outfile.with_name(f".{outfile.name}.tmp")
+    with pa.OSFile(str(tmp_file), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_file, outfile)
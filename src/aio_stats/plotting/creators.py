@@ -7,7 +7,69 @@
 import pandas as pd
 import plotly.graph_objects as go
 
-__all__ = ["make_min_max_dist", "make_min_max_scatter", "make_stats_trend"]
+__all__ = [
+    "add_time_of_day",
+    "make_location_trend",
+    "make_min_max_dist",
+    "make_min_max_scatter",
+    "make_stats_trend",
+]
+
+
+def add_time_of_day(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the hour in the day of the minimum and maximum to statistics.
+
+    The hours are taken from the local clock time of the time_of_min and
+    time_of_max columns, so the frame can hold any number of days, months
+    or locations as long as each column has a single time zone. Frames
+    that already have the hour columns are returned unchanged.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The statistics.
+
+    Returns
+    -------
+    pd.DataFrame
+        The statistics with hour_of_min and hour_of_max columns added.
+    """
+    if "hour_of_min" in df.columns and "hour_of_max" in df.columns:
+        return df
+    hours = {}
+    for column in ("min", "max"):
+        times = df[f"time_of_{column}"].dt
+        seconds = times.hour * 3600 + times.minute * 60 + times.second
+        hours[f"hour_of_{column}"] = seconds / 3600
+    return df.assign(**hours)
+
+
+def make_location_trend(type: str, fig: go.Figure, df: pd.DataFrame) -> None:
+    # Compare the daily mean of several locations with a trace for each.
+    y_axis_title = ""
+    plot_title = ""
+    if type == "Temp":
+        y_axis_title = "Temperature (°F)"
+        plot_title = "Temperature Trend by Location"
+    if type == "RH":
+        y_axis_title = "Relative Humidity (%)"
+        plot_title = "Relative Humidity Trend by Location"
+    if type == "Lux":
+        y_axis_title = "Light Level (lx)"
+        plot_title = "Light Level Trend by Location"
+
+    for location, ldf in df.sort_values("day").groupby("location", sort=True):
+        trace = go.Scatter(
+            mode="lines+markers",
+            x=ldf.day,
+            y=ldf["mean"],
+            name=location.replace("-", " ").title(),
+        )
+        fig.add_trace(trace)
+
+    fig.update_xaxes(title_text="Day in Month")
+    fig.update_yaxes(title_text=y_axis_title)
+    fig.update_layout(title=dict(text=plot_title, xanchor="center", x=0.5))
 
 
 def make_min_max_dist(type: str, fig: go.Figure, df: pd.DataFrame) -> None:
@@ -17,20 +79,9 @@ def make_min_max_dist(type: str, fig: go.Figure, df: pd.DataFrame) -> None:
     if type == "RH":
         plot_title += "Relative Humidity"
 
-    t_min = [
-        (
-            x.to_pydatetime() - x.to_pydatetime().replace(hour=0, minute=0, second=0)
-        ).seconds
-        / 3600
-        for x in df["time_of_min"]
-    ]
-    t_max = [
-        (
-            x.to_pydatetime() - x.to_pydatetime().replace(hour=0, minute=0, second=0)
-        ).seconds
-        / 3600
-        for x in df["time_of_max"]
-    ]
+    df = add_time_of_day(df)
+    t_min = df["hour_of_min"]
+    t_max = df["hour_of_max"]
 
     binning = dict(start=0, end=24, size=1)
     min_time_trace = go.Histogram(x=t_min, xbins=binning, name="min")
@@ -49,20 +100,9 @@ def make_min_max_scatter(type: str, fig: go.Figure, df: pd.DataFrame) -> None:
     if type == "RH":
         plot_title += "Relative Humidity"
 
-    t_min = [
-        (
-            x.to_pydatetime() - x.to_pydatetime().replace(hour=0, minute=0, second=0)
-        ).seconds
-        / 3600
-        for x in df["time_of_min"]
-    ]
-    t_max = [
-        (
-            x.to_pydatetime() - x.to_pydatetime().replace(hour=0, minute=0, second=0)
-        ).seconds
-        / 3600
-        for x in df["time_of_max"]
-    ]
+    df = add_time_of_day(df)
+    t_min = df["hour_of_min"]
+    t_max = df["hour_of_max"]
 
     min_time_trace = go.Scatter(
         mode="markers", x=df.day, y=t_min, marker_size=15, name="min"
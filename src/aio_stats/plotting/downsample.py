@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for reducing the number of points in a time series for plotting."""
+
+import numpy as np
+import pandas as pd
+
+from ..stats_engine import compute_stats
+
+__all__ = ["DOWNSAMPLE_METHODS", "downsample", "lttb", "min_max_decimate"]
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are kept and the rest of the data is split
+    into equal buckets. From each bucket the point making the largest
+    triangle with the point picked from the previous bucket and the average
+    of the next bucket is picked, which keeps the visual shape of the line.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        The increasing x values.
+    y : np.ndarray
+        The y values.
+    max_points : int
+        The number of points to keep. Must be at least 3.
+
+    Returns
+    -------
+    np.ndarray
+        The positions of the selected points.
+    """
+    n = x.size
+    if n <= max_points:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i < max_points - 3:
+            next_end = edges[i + 2]
+            x_next = x[end:next_end].mean()
+            y_next = y[end:next_end].mean()
+        else:
+            x_next = x[n - 1]
+            y_next = y[n - 1]
+        areas = np.abs(
+            (x[a] - x_next) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (y_next - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def min_max_decimate(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Keep the minimum and maximum of equal buckets of the data.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        The y values.
+    max_points : int
+        The number of points to keep. Must be at least 2.
+
+    Returns
+    -------
+    np.ndarray
+        The positions of the selected points in increasing order.
+    """
+    n = y.size
+    if n <= max_points:
+        return np.arange(n)
+    group_ids = np.arange(n) * (max_points // 2) // n
+    result = compute_stats(y, group_ids)
+    return np.unique(np.concatenate([result["argmin"], result["argmax"]]))
+
+
+def downsample(df: pd.DataFrame, max_points: int, method: str = "lttb") -> pd.DataFrame:
+    """Reduce a time series to a number of points.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data with a datetime index and the values in the first column.
+    max_points : int
+        The maximum number of points to keep. Must be at least 3.
+    method : str, optional
+        The selection method: lttb or minmax, by default lttb
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected rows. Rows without a value are dropped.
+    """
+    if max_points < 3:
+        raise ValueError("Downsampling needs to keep at least 3 points.")
+    column = df.columns[0]
+    df = df[df[column].notna()]
+    if len(df) <= max_points:
+        return df
+    y = df[column].to_numpy(dtype=np.float64)
+    if method == "lttb":
+        x = df.index.asi8
+        positions = lttb(x, y, max_points)
+    elif method == "minmax":
+        positions = min_max_decimate(y, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return df.iloc[positions]
@@ -4,32 +4,308 @@
 
 import argparse
 import calendar
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from importlib.resources import files
+from itertools import repeat
 import pathlib
 import shutil
+from typing import Any
 
 from jinja2 import Template
 import plotly.graph_objects as go
 import plotly.io as pio
 
 from . import creators
+from .render_cache import RenderCache, hash_files, hash_inputs
+from .renderer import export_figures, write_plotly_js
 from ..data_reader import DataReader
 from ..helpers import load_feed_settings
+from ..profiling import add_profile_arguments, profile_run
+from ..stats_maker import FILE_FORMATS
 
 __all__ = ["runner"]
 
+# Top of the statistics tree.
+STATS_DIR = "~/Documents/SensorData/stats"
 
-def main(opts: argparse.Namespace) -> None:
-    # Plotting things that only need to be done once.
+# Name used in place of a location for the comparison page.
+COMPARE_NAME = "All-Locations"
+
+
+def render_page(
+    location_stem: str,
+    template_text: str,
+    template_data: dict[str, Any],
+    plots: list[tuple[pathlib.Path, str]],
+    make_figures: Callable[[list[int]], list[go.Figure]],
+    cache: RenderCache,
+    html: bool,
+) -> tuple[pathlib.Path | None, dict[str, str]]:
+    """Make the figures that are out of date and the page showing them.
+
+    Parameters
+    ----------
+    location_stem : str
+        The name of the page and of the figure directory.
+    template_text : str
+        The Jinja template for the page.
+    template_data : dict[str, Any]
+        The data for the page template.
+    plots : list[tuple[pathlib.Path, str]]
+        The figure file and the hash of the figure inputs for each plot.
+    make_figures : Callable[[list[int]], list[go.Figure]]
+        Function creating the figures for a list of plot indexes.
+    cache : RenderCache
+        The input hashes of the existing outputs.
+    html : bool
+        Embed the figures in the page as JSON instead of exporting images.
+
+    Returns
+    -------
+    tuple[pathlib.Path | None, dict[str, str]]
+        The directory containing the new figures (None for embedded figures)
+        and the input hashes of the new outputs.
+    """
+    j2_template = Template(template_text, trim_blocks=True, lstrip_blocks=True)
+    output_html = pathlib.Path(f"{location_stem}.html")
+    updates = {}
+
+    if html:
+        key = hash_inputs(template_text, template_data, [x[1] for x in plots])
+        if not cache.is_current(str(output_html), key):
+            figures = make_figures(list(range(len(plots))))
+            # Keep the figure JSON from closing the script element.
+            template_data["plots"] = [
+                fig.to_json().replace("</", "<\\/") for fig in figures
+            ]
+            with output_html.open("w", encoding="utf-8") as ofile:
+                ofile.write((j2_template.render(template_data)))
+            updates[str(output_html)] = key
+        return None, updates
+
+    fig_path = pathlib.Path(location_stem)
+    fig_path.mkdir(exist_ok=True)
+
+    stale = [
+        i
+        for i, (fig_file, key) in enumerate(plots)
+        if not cache.is_current(str(fig_file), key)
+    ]
+    figures = make_figures(stale)
+    export_figures(figures, [plots[i][0] for i in stale])
+    for i in stale:
+        updates[str(plots[i][0])] = plots[i][1]
+
+    template_data["figs"] = [x[0] for x in plots]
+    key = hash_inputs(template_text, template_data)
+    if not cache.is_current(str(output_html), key):
+        with output_html.open("w", encoding="utf-8") as ofile:
+            ofile.write((j2_template.render(template_data)))
+        updates[str(output_html)] = key
+
+    return fig_path, updates
+
+
+def render_location(
+    location: str,
+    year: int,
+    month: int,
+    template_text: str,
+    cache: RenderCache,
+    html: bool = False,
+    file_format: str = "parquet",
+) -> tuple[pathlib.Path | None, dict[str, str]]:
+    """Create the figures and the page for a location.
+
+    This runs in the worker processes when rendering in parallel, so it only
+    takes arguments that can be sent to another process. Figures and pages
+    whose inputs match the render cache are not made again.
+
+    Parameters
+    ----------
+    location : str
+        The sensor location.
+    year : int
+        The year to plot.
+    month : int
+        The month to plot.
+    template_text : str
+        The Jinja template for the page.
+    cache : RenderCache
+        The input hashes of the existing outputs.
+    html : bool, optional
+        Embed the figures in the page, by default False
+    file_format : str, optional
+        Format of the statistics files, by default parquet
+
+    Returns
+    -------
+    tuple[pathlib.Path | None, dict[str, str]]
+        The directory containing the new figures (None for embedded figures)
+        and the input hashes of the new outputs.
+    """
+    # Plotting things that need to be done in every process.
     pio.templates.default = "plotly_dark"
     layout = dict(height=525, width=700)
 
-    input_template = files("aio_stats.data").joinpath("stats_plotting.html")
-    j2_template = Template(
-        input_template.read_text(), trim_blocks=True, lstrip_blocks=True
+    m = calendar.Month(month)
+    m_str = f"{month:02d}"
+
+    stat_feeds = load_feed_settings()
+
+    template_data = {
+        "location": location.title(),
+        "year": year,
+        "month": m.name.title(),
+        "figs": [],
+    }
+
+    top_data_path = f"{STATS_DIR}/{location}"
+    location_stem = f"{location.title()}_{year}{m_str}"
+    fig_path = pathlib.Path(location_stem)
+
+    plots = []
+    sources = []
+    for feed in stat_feeds["locations"][location]["feeds"]:
+        data_path = pathlib.Path(f"{top_data_path}/{feed}/{year}/{m_str}")
+        data_hash = hash_files(data_path)
+
+        plot_functions = stat_feeds["plotting"][feed]
+        for plot_function in plot_functions:
+            short_name = stat_feeds["shorts"][feed]
+            fig_file: pathlib.Path = fig_path / f"{feed}_{plot_function}.svg"
+            key = hash_inputs(
+                data_hash, plot_function, short_name, layout, pio.templates.default
+            )
+            plots.append((fig_file, key))
+            sources.append((data_path, plot_function, short_name))
+
+    def make_figures(indexes: list[int]) -> list[go.Figure]:
+        frames = {}
+        figures = []
+        for i in indexes:
+            data_path, plot_function, short_name = sources[i]
+            if data_path not in frames:
+                data = DataReader(data_path, use_cache=True, file_format=file_format)
+                data.read_month()
+                frames[data_path] = data.table.to_pandas()
+
+            fig = go.Figure(layout=layout)
+            plotter = getattr(creators, f"make_{plot_function}")
+            plotter(short_name, fig, frames[data_path])
+            figures.append(fig)
+        return figures
+
+    return render_page(
+        location_stem, template_text, template_data, plots, make_figures, cache, html
+    )
+
+
+def render_comparison(
+    locations: list[str],
+    year: int,
+    month: int,
+    template_text: str,
+    cache: RenderCache,
+    html: bool = False,
+    file_format: str = "parquet",
+) -> tuple[pathlib.Path | None, dict[str, str]]:
+    """Create a page comparing the locations for every feed.
+
+    The statistics of all the locations are read in a single scan and each
+    feed gets one figure with a trace per location.
+
+    Parameters
+    ----------
+    locations : list[str]
+        The sensor locations.
+    year : int
+        The year to plot.
+    month : int
+        The month to plot.
+    template_text : str
+        The Jinja template for the page.
+    cache : RenderCache
+        The input hashes of the existing outputs.
+    html : bool, optional
+        Embed the figures in the page, by default False
+    file_format : str, optional
+        Format of the statistics files, by default parquet
+
+    Returns
+    -------
+    tuple[pathlib.Path | None, dict[str, str]]
+        The directory containing the new figures (None for embedded figures)
+        and the input hashes of the new outputs.
+    """
+    pio.templates.default = "plotly_dark"
+    layout = dict(height=525, width=700)
+
+    m = calendar.Month(month)
+    m_str = f"{month:02d}"
+
+    stat_feeds = load_feed_settings()
+
+    template_data = {
+        "location": COMPARE_NAME.replace("-", " "),
+        "year": year,
+        "month": m.name.title(),
+        "figs": [],
+    }
+
+    location_stem = f"{COMPARE_NAME}_{year}{m_str}"
+    fig_path = pathlib.Path(location_stem)
+
+    plots = []
+    sources = []
+    for feed in stat_feeds["plotting"]:
+        feed_locations = [
+            location
+            for location in locations
+            if feed in stat_feeds["locations"][location]["feeds"]
+        ]
+        if not feed_locations:
+            continue
+        data_hash = [
+            hash_files(pathlib.Path(f"{STATS_DIR}/{location}/{feed}/{year}/{m_str}"))
+            for location in feed_locations
+        ]
+        short_name = stat_feeds["shorts"][feed]
+        fig_file: pathlib.Path = fig_path / f"{feed}_location_trend.svg"
+        key = hash_inputs(
+            data_hash, "location_trend", short_name, layout, pio.templates.default
+        )
+        plots.append((fig_file, key))
+        sources.append((feed, short_name))
+
+    def make_figures(indexes: list[int]) -> list[go.Figure]:
+        if not indexes:
+            return []
+        feeds = [sources[i][0] for i in indexes]
+        data = DataReader(
+            pathlib.Path(STATS_DIR), use_cache=True, file_format=file_format
+        )
+        data.read_locations(year, month, locations, feeds)
+        df = data.table.to_pandas()
+        figures = []
+        for i in indexes:
+            feed, short_name = sources[i]
+            fig = go.Figure(layout=layout)
+            creators.make_location_trend(short_name, fig, df[df.feed == feed])
+            figures.append(fig)
+        return figures
+
+    return render_page(
+        location_stem, template_text, template_data, plots, make_figures, cache, html
     )
 
+
+def main(opts: argparse.Namespace) -> None:
+    input_template = files("aio_stats.data").joinpath("stats_plotting.html")
+    template_text = input_template.read_text()
+
     if opts.year is None and opts.month is None:
         local_time = datetime.now()
         if opts.shift_day:
@@ -40,7 +316,6 @@ def main(opts: argparse.Namespace) -> None:
         year = opts.year
         month = opts.month
 
-    m = calendar.Month(month)
     m_str = f"{month:02d}"
 
     stat_feeds = load_feed_settings()
@@ -50,46 +325,63 @@ def main(opts: argparse.Namespace) -> None:
     else:
         locations = list(stat_feeds["locations"])
 
+    if opts.output_dir is not None:
+        full_path = opts.output_dir.expanduser() / str(year) / m_str
+    else:
+        full_path = pathlib.Path(".")
+    cache = RenderCache(full_path, opts.force)
+
+    if opts.compare:
+        results = [
+            render_comparison(
+                locations,
+                year,
+                month,
+                template_text,
+                cache,
+                opts.html,
+                opts.file_format,
+            )
+        ]
+    elif opts.workers > 1:
+        with ProcessPoolExecutor(max_workers=opts.workers) as executor:
+            results = list(
+                executor.map(
+                    render_location,
+                    locations,
+                    repeat(year),
+                    repeat(month),
+                    repeat(template_text),
+                    repeat(cache),
+                    repeat(opts.html),
+                    repeat(opts.file_format),
+                )
+            )
+    else:
+        results = [
+            render_location(
+                location,
+                year,
+                month,
+                template_text,
+                cache,
+                opts.html,
+                opts.file_format,
+            )
+            for location in locations
+        ]
+
     fig_paths = []
-    for location in locations:
-
-        template_data = {
-            "location": location.title(),
-            "year": year,
-            "month": m.name.title(),
-            "figs": [],
-        }
-
-        top_data_path = f"~/Documents/SensorData/stats/{location}"
-        location_stem = f"{location.title()}_{year}{m_str}"
-        fig_path = pathlib.Path(location_stem)
-        fig_path.mkdir(exist_ok=True)
-        fig_paths.append(fig_path)
-
-        for feed in stat_feeds["locations"][location]["feeds"]:
-            data_path = f"{top_data_path}/{feed}/{year}/{m_str}"
-
-            data = DataReader(pathlib.Path(data_path))
-            data.read_month()
-            df = data.table.to_pandas()
-
-            plot_functions = stat_feeds["plotting"][feed]
-            for plot_function in plot_functions:
-                short_name = stat_feeds["shorts"][feed]
-                fig = go.Figure(layout=layout)
-                plotter = getattr(creators, f"make_{plot_function}")
-                plotter(short_name, fig, df)
-                fig_file: pathlib.Path = fig_path / f"{feed}_{plot_function}.svg"
-                fig.write_image(fig_file)
-                template_data["figs"].append(fig_file)
-
-        output_html = pathlib.Path(f"{location_stem}.html")
+    for fig_path, updates in results:
+        if fig_path is not None:
+            fig_paths.append(fig_path)
+        cache.entries.update(updates)
 
-        with output_html.open("w", encoding="utf-8") as ofile:
-            ofile.write((j2_template.render(template_data)))
+    if opts.html and opts.output_dir is not None:
+        # The pages use the same relative path as the style sheet.
+        write_plotly_js(opts.output_dir.expanduser().parent)
 
     if opts.output_dir is not None:
-        full_path = opts.output_dir.expanduser() / str(year) / m_str
         if not full_path.exists():
             full_path.mkdir(parents=True)
 
@@ -108,6 +400,8 @@ def main(opts: argparse.Namespace) -> None:
                 pass
             shutil.rmtree(p)
 
+    cache.save()
+
 
 def runner() -> None:
     parser = argparse.ArgumentParser()
@@ -130,6 +424,44 @@ def runner() -> None:
         help="Shift the time used by a day to support data collection.",
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of locations to render in parallel processes.",
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Make all figures and pages even if their inputs have not changed.",
+    )
+
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Make a single page comparing the locations instead of a page "
+        "for each location.",
+    )
+
+    parser.add_argument(
+        "--html",
+        action="store_true",
+        help="Embed interactive figures in the pages instead of SVG images. "
+        "The shared plotly.js is written to static/js next to the output "
+        "directory.",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        choices=FILE_FORMATS,
+        default="parquet",
+        help="Format of the statistics files.",
+    )
+
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
-    main(args)
+    with profile_run(args):
+        main(args)
@@ -6,16 +6,115 @@ import argparse
 import calendar
 from datetime import datetime
 from importlib.resources import files
+import json
 import pathlib
 import shutil
+from typing import Any
 
 from jinja2 import Template
 
+from ..helpers import atomic_write_text
+from ..profiling import add_profile_arguments, profile_run
 
 __all__ = ["runner"]
 
 
+# Name of the file in the site directory describing the index pages.
+MANIFEST_FILE = ".site_manifest.json"
+
+
+def scan_site(data_dir: pathlib.Path) -> dict[str, dict[str, Any]]:
+    """Walk the site tree once and collect the data for every index page.
+
+    Parameters
+    ----------
+    data_dir : pathlib.Path
+        The top of the site tree containing the year directories.
+
+    Returns
+    -------
+    dict[str, dict[str, Any]]
+        The template data for each index page keyed by the page path
+        relative to the site directory.
+    """
+    pages = {"index.html": {"years": []}}
+    for ydir in sorted(data_dir.iterdir()):
+        if not (ydir.is_dir() and ydir.name.isdigit()):
+            continue
+        year = int(ydir.name)
+        pages["index.html"]["years"].append(ydir.name)
+        m_template_data = {"year": year, "months": []}
+        for mdir in sorted(ydir.iterdir()):
+            if not (mdir.is_dir() and mdir.name.isdigit()):
+                continue
+            m = calendar.Month(int(mdir.name))
+            m_template_data["months"].append((mdir.name, m.name.title()))
+            l_template_data = {"year": year, "month": m.name.title(), "locations": []}
+            for lfile in sorted(mdir.iterdir()):
+                if (
+                    lfile.is_file()
+                    and lfile.suffix == ".html"
+                    and lfile.stem != "index"
+                ):
+                    loc = lfile.stem.split("_")[0]
+                    l_template_data["locations"].append((lfile.name, loc))
+            pages[f"{ydir.name}/{mdir.name}/index.html"] = l_template_data
+        pages[f"{ydir.name}/index.html"] = m_template_data
+    return pages
+
+
+def build_site(data_dir: pathlib.Path, force: bool = False) -> list[pathlib.Path]:
+    """Write the year, month and location index pages of the site.
+
+    Only pages whose links changed since the last build, or which are
+    missing, are written. The page data is kept in a manifest in the site
+    directory for the next build.
+
+    Parameters
+    ----------
+    data_dir : pathlib.Path
+        The top of the site tree containing the year directories.
+    force : bool, optional
+        Write all the pages, by default False
+
+    Returns
+    -------
+    list[pathlib.Path]
+        The pages that were written.
+    """
+    manifest_file = data_dir / MANIFEST_FILE
+    manifest = {}
+    if manifest_file.exists() and not force:
+        manifest = json.loads(manifest_file.read_text())
+
+    templates = {}
+    for depth, name in enumerate(["year_nav", "month_nav", "location_nav"]):
+        nav_template = files("aio_stats.data").joinpath(f"{name}.html")
+        templates[depth] = Template(
+            nav_template.read_text(), trim_blocks=True, lstrip_blocks=True
+        )
+
+    # Round trip through JSON so tuples compare equal to the saved lists.
+    pages = json.loads(json.dumps(scan_site(data_dir)))
+    written = []
+    for page, template_data in pages.items():
+        index_page = data_dir / page
+        if manifest.get(page) == template_data and index_page.exists():
+            continue
+        j2_template = templates[page.count("/")]
+        atomic_write_text(index_page, j2_template.render(template_data))
+        written.append(index_page)
+
+    atomic_write_text(manifest_file, json.dumps(pages, indent=2))
+    return written
+
+
 def main(opts: argparse.Namespace) -> None:
+    if opts.generator == "site":
+        for index_page in build_site(opts.data_dir.expanduser(), opts.force):
+            print(f"Wrote {index_page}")
+        return
+
     index_page = pathlib.Path("index.html")
 
     if opts.generator == "year":
@@ -96,12 +195,26 @@ def runner() -> None:
         "data_dir", type=pathlib.Path, help="Directory for page generation."
     )
 
-    parser.add_argument("generator", choices=["year", "month", "location"])
+    parser.add_argument(
+        "generator",
+        choices=["year", "month", "location", "site"],
+        help="The index page to make. The site generator makes all the index "
+        "pages that are out of date in one pass.",
+    )
 
     parser.add_argument(
         "--month", type=int, help="The month to generate the location page."
     )
 
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Make all the index pages for the site generator.",
+    )
+
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
-    main(args)
+    with profile_run(args):
+        main(args)
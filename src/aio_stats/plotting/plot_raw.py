@@ -11,7 +11,11 @@ import plotly.io as pio
 
 from ..data_reader import DataReader
 from ..helpers import load_feed_settings
+from ..profiling import add_profile_arguments, profile_run
+from ..stats_maker import FILE_FORMATS
+from .downsample import DOWNSAMPLE_METHODS
 from .raw_data import make_line_plot
+from .renderer import export_figures
 
 __all__ = ["runner"]
 
@@ -21,7 +25,9 @@ def main(opts: argparse.Namespace) -> None:
     pio.templates.default = "plotly_dark"
     layout = dict(height=525, width=700)
 
-    dr = DataReader(opts.file_path.expanduser())
+    dr = DataReader(
+        opts.file_path.expanduser(), use_cache=True, file_format=opts.file_format
+    )
     dr.read_day(opts.year, opts.month, opts.day)
 
     name = opts.file_path.parts[-1]
@@ -38,12 +44,14 @@ def main(opts: argparse.Namespace) -> None:
         file_stem = "test"
         plot_title = file_stem.capitalize()
 
-    make_line_plot(plot_title, short, fig, dr.table.to_pandas())
+    make_line_plot(
+        plot_title, short, fig, dr.table.to_pandas(), opts.max_points, opts.downsample
+    )
 
     if opts.html:
         fig.write_html(f"{file_stem}.html")
     else:
-        fig.write_image(f"{file_stem}.svg")
+        export_figures([fig], [f"{file_stem}.svg"])
 
 
 def runner() -> None:
@@ -63,6 +71,29 @@ def runner() -> None:
         "--html", action="store_true", help="Create HTML plot instead of SVG."
     )
 
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        help="Downsample the data to at most this many points.",
+    )
+
+    parser.add_argument(
+        "--downsample",
+        choices=DOWNSAMPLE_METHODS,
+        default="lttb",
+        help="The downsampling method used with --max-points.",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        choices=FILE_FORMATS,
+        default="parquet",
+        help="Format of the raw data files.",
+    )
+
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
-    main(args)
+    with profile_run(args):
+        main(args)
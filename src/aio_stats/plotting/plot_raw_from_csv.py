@@ -13,8 +13,11 @@ import plotly.io as pio
 
 from ..aio_file import AioFile
 from ..helpers import load_feed_settings
-from .raw_data import make_line_plot
+from ..profiling import add_profile_arguments, profile_run
 from ..stats_maker import StatsMaker
+from .downsample import DOWNSAMPLE_METHODS
+from .raw_data import make_line_plot
+from .renderer import export_figures
 
 __all__ = ["runner"]
 
@@ -35,9 +38,7 @@ def main(opts: argparse.Namespace) -> None:
         end_dt = opts.end
 
     af = AioFile(opts.file_path.expanduser())
-    af.read_data()
-    data_records = af.read_data()
-    data = af.transform_data(data_records, opts.timezone)
+    data = af.read_range(opts.timezone, start_dt, end_dt)
     name = opts.file_path.name.split("-")[0].lower()
     if "_" in name:
         name = name.replace("_", "-")
@@ -59,12 +60,12 @@ def main(opts: argparse.Namespace) -> None:
         file_stem = "test"
         plot_title = file_stem.capitalize()
 
-    make_line_plot(plot_title, short, fig, stats.df)
+    make_line_plot(plot_title, short, fig, stats.df, opts.max_points, opts.downsample)
 
     if opts.html:
         fig.write_html(f"{file_stem}.html")
     else:
-        fig.write_image(f"{file_stem}.svg")
+        export_figures([fig], [f"{file_stem}.svg"])
 
 
 def runner() -> None:
@@ -92,6 +93,22 @@ def runner() -> None:
         "--html", action="store_true", help="Create HTML plot instead of SVG."
     )
 
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        help="Downsample the data to at most this many points.",
+    )
+
+    parser.add_argument(
+        "--downsample",
+        choices=DOWNSAMPLE_METHODS,
+        default="lttb",
+        help="The downsampling method used with --max-points.",
+    )
+
+    add_profile_arguments(parser)
+
     args = parser.parse_args()
 
-    main(args)
+    with profile_run(args):
+        main(args)
@@ -7,13 +7,23 @@
 import pandas as pd
 import plotly.graph_objects as go
 
+from .downsample import downsample
+
 __all__ = ["make_line_plot"]
 
 
 def make_line_plot(
-    plot_title: str, type: str, fig: go.Figure, df: pd.DataFrame
+    plot_title: str,
+    type: str,
+    fig: go.Figure,
+    df: pd.DataFrame,
+    max_points: int | None = None,
+    method: str = "lttb",
 ) -> None:
     # This function is used for plotting the raw data.
+    if max_points is not None:
+        df = downsample(df, max_points, method)
+
     y_axis_title = ""
     if type == "Temp":
         y_axis_title = "Temperature (°F)"
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for skipping figures and pages whose inputs have not changed."""
+
+import hashlib
+import json
+import pathlib
+from typing import Any
+
+from ..helpers import atomic_write_text
+
+__all__ = ["CACHE_FILE", "RenderCache", "hash_files", "hash_inputs"]
+
+# Name of the file in the output directory holding the input hashes.
+CACHE_FILE = ".render_cache.json"
+
+
+def hash_files(data_dir: pathlib.Path) -> str:
+    """Return a hash of the names and contents of the files in a directory.
+
+    Parameters
+    ----------
+    data_dir : pathlib.Path
+        The directory to hash. Hidden files are skipped.
+
+    Returns
+    -------
+    str
+        The hex digest or an empty string if the directory does not exist.
+    """
+    data_dir = data_dir.expanduser()
+    if not data_dir.exists():
+        return ""
+    digest = hashlib.sha256()
+    for data_file in sorted(data_dir.rglob("*")):
+        if not data_file.is_file() or data_file.name.startswith("."):
+            continue
+        digest.update(str(data_file.relative_to(data_dir)).encode())
+        with data_file.open("rb") as ifile:
+            digest.update(hashlib.file_digest(ifile, "sha256").digest())
+    return digest.hexdigest()
+
+
+def hash_inputs(*parts: Any) -> str:
+    """Return a hash of the inputs for an output file.
+
+    Parameters
+    ----------
+    *parts : Any
+        The inputs. They must be serializable to JSON, other than paths
+        which are converted to strings.
+
+    Returns
+    -------
+    str
+        The hex digest.
+    """
+    text = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class RenderCache:
+
+    def __init__(self, output_dir: pathlib.Path, force: bool = False) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        output_dir : pathlib.Path
+            The directory the outputs end up in.
+        force : bool, optional
+            Ignore the saved hashes, by default False
+        """
+        self.output_dir = output_dir
+        self.cache_file = output_dir / CACHE_FILE
+        self.entries: dict[str, str] = {}
+        if not force and self.cache_file.exists():
+            with self.cache_file.open() as ifile:
+                self.entries = json.load(ifile)
+
+    def is_current(self, name: str, key: str) -> bool:
+        """Check if an output is up to date.
+
+        Parameters
+        ----------
+        name : str
+            The output file relative to the output directory.
+        key : str
+            The hash of the current inputs.
+
+        Returns
+        -------
+        bool
+            True if the output exists and was made from the same inputs.
+        """
+        return self.entries.get(name) == key and (self.output_dir / name).exists()
+
+    def save(self) -> None:
+        """Write the hashes to the output directory."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            self.cache_file, json.dumps(self.entries, indent=2, sort_keys=True)
+        )
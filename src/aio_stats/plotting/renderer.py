@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for exporting figures to image files."""
+
+import atexit
+import multiprocessing
+import pathlib
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from ..helpers import atomic_write_text
+from ..profiling import profiled
+
+try:
+    import kaleido
+except ImportError:
+    kaleido = None
+
+__all__ = ["export_figures", "start_renderer", "write_plotly_js"]
+
+# Kaleido v1 exports through a headless browser and can keep one running.
+HAS_SYNC_SERVER = kaleido is not None and hasattr(kaleido, "start_sync_server")
+
+_renderer_started = False
+
+
+def start_renderer() -> None:
+    """Keep an image export engine running for the rest of the process.
+
+    Without it, every export call starts and stops its own browser. This
+    can be called more than once. It does nothing in the worker processes
+    of a pool, since they exit without stopping the engine, or if Kaleido v1
+    is not installed.
+    """
+    global _renderer_started
+    if _renderer_started or not HAS_SYNC_SERVER:
+        return
+    if multiprocessing.parent_process() is not None:
+        return
+    kaleido.start_sync_server(silence_warnings=True)
+    atexit.register(kaleido.stop_sync_server, silence_warnings=True)
+    _renderer_started = True
+
+
+@profiled("export_figures", lambda result, args: (len(args[0]), None))
+def export_figures(figures: list[go.Figure], files: list[pathlib.Path | str]) -> None:
+    """Write a batch of figures to image files in one call.
+
+    The image format comes from the file extensions.
+
+    Parameters
+    ----------
+    figures : list[go.Figure]
+        The figures to export.
+    files : list[pathlib.Path | str]
+        The output file for each figure.
+    """
+    if not figures:
+        return
+    start_renderer()
+    if HAS_SYNC_SERVER:
+        pio.write_images(figures, files)
+    else:
+        for fig, fig_file in zip(figures, files):
+            fig.write_image(fig_file)
+
+
+def write_plotly_js(site_dir: pathlib.Path) -> pathlib.Path:
+    """Write the plotly.js bundle shared by the interactive pages.
+
+    The file is only written if it is missing or from another plotly
+    version.
+
+    Parameters
+    ----------
+    site_dir : pathlib.Path
+        The top of the site holding the static directory.
+
+    Returns
+    -------
+    pathlib.Path
+        The plotly.js file.
+    """
+    js_file = site_dir / "static" / "js" / "plotly.min.js"
+    plotly_js = get_plotlyjs()
+    if not js_file.exists() or js_file.read_text(encoding="utf-8") != plotly_js:
+        js_file.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(js_file, plotly_js)
+    return js_file
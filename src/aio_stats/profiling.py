@@ -0,0 +1,290 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for timing the stages of the data pipeline."""
+
+import argparse
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import cProfile
+import csv
+import functools
+import json
+import pathlib
+import threading
+import time
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+
+__all__ = [
+    "PROFILER",
+    "Profiler",
+    "add_profile_arguments",
+    "attribute_size",
+    "data_size",
+    "profile_run",
+    "profiled",
+    "result_size",
+]
+
+# Report written when only a cProfile stage is asked for.
+DEFAULT_REPORT = "profile.json"
+
+# Columns of a stage record.
+RECORD_FIELDS = ["stage", "start", "seconds", "rows", "bytes", "thread"]
+
+
+class Profiler:
+
+    def __init__(self) -> None:
+        """Class constructor.
+
+        The profiler starts disabled, so the instrumented code only pays for
+        a flag check.
+        """
+        self.enabled = False
+        self.records: list[dict[str, Any]] = []
+        self.cprofile_stage: str | None = None
+        self.cprofile: cProfile.Profile | None = None
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+
+    def enable(self, cprofile_stage: str | None = None) -> None:
+        """Start recording stages.
+
+        Parameters
+        ----------
+        cprofile_stage : str | None, optional
+            Run cProfile on every call of this stage, by default None
+        """
+        self.enabled = True
+        self.records = []
+        self.cprofile_stage = cprofile_stage
+        self.cprofile = cProfile.Profile() if cprofile_stage is not None else None
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict[str, Any]]:
+        """Time a stage of the pipeline.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+
+        Yields
+        ------
+        dict[str, Any]
+            The record of the stage. The rows and bytes entries can be set
+            by the caller.
+        """
+        record = {
+            "stage": name,
+            "rows": None,
+            "bytes": None,
+            "thread": threading.current_thread().name,
+        }
+        # cProfile can only follow one call at a time.
+        use_cprofile = name == self.cprofile_stage and self._cprofile_lock.acquire(
+            False
+        )
+        start = time.perf_counter()
+        if use_cprofile:
+            self.cprofile.enable()
+        try:
+            yield record
+        finally:
+            if use_cprofile:
+                self.cprofile.disable()
+                self._cprofile_lock.release()
+            end = time.perf_counter()
+            record["start"] = start - self._origin
+            record["seconds"] = end - start
+            with self._lock:
+                self.records.append(record)
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Return the totals for each stage.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            The number of calls, time, rows and bytes of each stage.
+        """
+        totals: dict[str, dict[str, Any]] = {}
+        for record in self.records:
+            total = totals.setdefault(
+                record["stage"], {"calls": 0, "seconds": 0.0, "rows": 0, "bytes": 0}
+            )
+            total["calls"] += 1
+            total["seconds"] += record["seconds"]
+            total["rows"] += record["rows"] or 0
+            total["bytes"] += record["bytes"] or 0
+        return totals
+
+    def report(self, outfile: pathlib.Path) -> None:
+        """Write the stage records to file.
+
+        A file with a .csv extension gets one line per record. Any other
+        file gets JSON with the records and the totals for each stage.
+
+        Parameters
+        ----------
+        outfile : pathlib.Path
+            The file to write.
+        """
+        with self._lock:
+            records = sorted(self.records, key=lambda x: x["start"])
+        if outfile.suffix == ".csv":
+            with outfile.open("w", newline="") as ofile:
+                writer = csv.DictWriter(ofile, fieldnames=RECORD_FIELDS)
+                writer.writeheader()
+                writer.writerows(records)
+        else:
+            with outfile.open("w") as ofile:
+                json.dump(
+                    {"stages": records, "summary": self.summary()}, ofile, indent=2
+                )
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(outfile.with_suffix(".prof"))
+
+
+# Profiler shared by the whole process.
+PROFILER = Profiler()
+
+
+def data_size(data: Any) -> tuple[int | None, int | None]:
+    """Return the number of rows and bytes of some data.
+
+    Parameters
+    ----------
+    data : Any
+        A table, dataframe or sequence. Other data is not measured.
+
+    Returns
+    -------
+    tuple[int | None, int | None]
+        The rows and bytes of the data. Bytes are None for sequences.
+    """
+    if isinstance(data, pa.Table):
+        return data.num_rows, data.nbytes
+    if isinstance(data, pd.DataFrame):
+        return len(data), int(data.memory_usage(index=True).sum())
+    if isinstance(data, list | tuple):
+        return len(data), None
+    return None, None
+
+
+def result_size(result: Any, args: tuple) -> tuple[int | None, int | None]:
+    """Measure the return value of a stage."""
+    return data_size(result)
+
+
+def attribute_size(name: str) -> Callable[[Any, tuple], tuple[int | None, int | None]]:
+    """Measure an attribute of the instance after a method stage.
+
+    Parameters
+    ----------
+    name : str
+        The name of the attribute.
+
+    Returns
+    -------
+    Callable[[Any, tuple], tuple[int | None, int | None]]
+        The size function for profiled.
+    """
+
+    def size(result: Any, args: tuple) -> tuple[int | None, int | None]:
+        return data_size(getattr(args[0], name))
+
+    return size
+
+
+def profiled(
+    stage: str | None = None,
+    size: Callable[[Any, tuple], tuple[int | None, int | None]] | None = None,
+) -> Callable:
+    """Decorate a function so its calls are recorded as a stage.
+
+    Parameters
+    ----------
+    stage : str | None, optional
+        The name of the stage, by default None (the qualified function name)
+    size : Callable[[Any, tuple], tuple[int | None, int | None]] | None, optional
+        Function returning the rows and bytes handled from the result and
+        the call arguments, by default None
+
+    Returns
+    -------
+    Callable
+        The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = stage if stage is not None else func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.stage(name) as record:
+                result = func(*args, **kwargs)
+            # Measuring is kept out of the stage time.
+            if size is not None:
+                record["rows"], record["bytes"] = size(result, args)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the profiling options to a command-line parser.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The parser for the script.
+    """
+    parser.add_argument(
+        "--profile",
+        type=pathlib.Path,
+        help="Write the time, rows and bytes of each pipeline stage to this "
+        "file. A .csv extension writes CSV, otherwise JSON is written. Stages "
+        "run in worker processes are not recorded.",
+    )
+
+    parser.add_argument(
+        "--profile-stage",
+        help="Also run cProfile on the given stage (for example "
+        "StatsMaker.make_stats). The output goes next to the --profile file "
+        f"with a .prof extension. Implies --profile {DEFAULT_REPORT}.",
+    )
+
+
+@contextmanager
+def profile_run(opts: argparse.Namespace) -> Iterator[None]:
+    """Record the stages of a script run if asked for.
+
+    Parameters
+    ----------
+    opts : argparse.Namespace
+        The command-line options with the profiling options.
+    """
+    if opts.profile is None and opts.profile_stage is not None:
+        opts.profile = pathlib.Path(DEFAULT_REPORT)
+    if opts.profile is None:
+        yield
+        return
+    PROFILER.enable(opts.profile_stage)
+    try:
+        with PROFILER.stage("total"):
+            yield
+    finally:
+        PROFILER.enabled = False
+        PROFILER.report(opts.profile.expanduser())
@@ -0,0 +1,250 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for keeping hourly, daily and monthly rollups of the raw data."""
+
+from datetime import datetime
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .compact import write_compacted
+
+__all__ = [
+    "ROLLUP_COLUMNS",
+    "ROLLUP_GRANULARITIES",
+    "combine_rollups",
+    "make_rollup",
+    "rollup_file",
+    "update_rollups",
+]
+
+ROLLUP_GRANULARITIES = ("hourly", "daily", "monthly")
+
+# Values kept for each period. The mean and variance follow from them.
+ROLLUP_COLUMNS = ["count", "sum", "sumsq", "min", "max"]
+
+
+def period_starts(times: pd.DatetimeIndex, granularity: str) -> pd.DatetimeIndex:
+    """Return the local start of the period containing each time.
+
+    Parameters
+    ----------
+    times : pd.DatetimeIndex
+        Time zone aware times.
+    granularity : str
+        The period: hourly, daily or monthly.
+
+    Returns
+    -------
+    pd.DatetimeIndex
+        The period starts named period.
+    """
+    if granularity == "hourly":
+        # Removing the minutes keeps the two local 1 AM hours apart when the
+        # clocks fall back.
+        offsets = (
+            pd.to_timedelta(times.minute, unit="min")
+            + pd.to_timedelta(times.second, unit="s")
+            + pd.to_timedelta(times.microsecond, unit="us")
+            + pd.to_timedelta(times.nanosecond, unit="ns")
+        )
+        starts = times - offsets
+    elif granularity == "daily":
+        starts = times.normalize()
+    elif granularity == "monthly":
+        wall_times = times.tz_localize(None).normalize()
+        starts = (wall_times - pd.to_timedelta(times.day - 1, unit="D")).tz_localize(
+            times.tz
+        )
+    else:
+        raise ValueError(f"Unknown rollup granularity: {granularity}")
+    return starts.rename("period")
+
+
+def make_rollup(df: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """Aggregate raw data into periods.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Raw data with a datetime index and the values in the first column.
+    granularity : str
+        The period: hourly, daily or monthly.
+
+    Returns
+    -------
+    pd.DataFrame
+        The rollup columns indexed by the period start. Periods without
+        values are left out.
+    """
+    values = df[df.columns[0]].to_numpy(dtype=np.float64)
+    data = pd.DataFrame(
+        {"value": values, "square": values * values},
+        index=period_starts(df.index, granularity),
+    )
+    grouped = data.groupby(level=0)
+    rollup = pd.DataFrame(
+        {
+            "count": grouped["value"].count(),
+            "sum": grouped["value"].sum(),
+            "sumsq": grouped["square"].sum(),
+            "min": grouped["value"].min(),
+            "max": grouped["value"].max(),
+        }
+    )
+    return rollup[rollup["count"] > 0]
+
+
+def combine_rollups(rollup: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """Aggregate rollups into a coarser period.
+
+    Parameters
+    ----------
+    rollup : pd.DataFrame
+        The rollup to aggregate.
+    granularity : str
+        The coarser period: daily or monthly.
+
+    Returns
+    -------
+    pd.DataFrame
+        The rollup columns indexed by the period start.
+    """
+    grouped = rollup.groupby(period_starts(rollup.index, granularity))
+    return grouped.agg(
+        {"count": "sum", "sum": "sum", "sumsq": "sum", "min": "min", "max": "max"}
+    )
+
+
+def rollup_file(
+    top_level: pathlib.Path,
+    location: str,
+    feed: str,
+    granularity: str,
+    period: datetime | None = None,
+) -> pathlib.Path:
+    """Return the file holding the rollup for a period.
+
+    Hourly rollups are kept in a file per month, daily rollups in a file per
+    year and monthly rollups in a single file.
+
+    Parameters
+    ----------
+    top_level : pathlib.Path
+        Main directory where the data is saved.
+    location : str
+        Sensor location.
+    feed : str
+        The name of the feed.
+    granularity : str
+        The period: hourly, daily or monthly.
+    period : datetime | None, optional
+        A time in the period, not needed for monthly rollups.
+
+    Returns
+    -------
+    pathlib.Path
+        The rollup file.
+    """
+    base = top_level / "rollups" / location / feed / granularity
+    if granularity == "hourly":
+        return base / str(period.year) / f"{period.month:02d}.parquet"
+    if granularity == "daily":
+        return base / f"{period.year}.parquet"
+    return base.with_suffix(".parquet")
+
+
+def _load(infile: pathlib.Path) -> pd.DataFrame | None:
+    """Read a rollup file if it exists."""
+    if not infile.exists():
+        return None
+    return pd.read_parquet(infile)
+
+
+def _save(rollup: pd.DataFrame, outfile: pathlib.Path) -> None:
+    """Write a rollup file."""
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    write_compacted(pa.Table.from_pandas(rollup.sort_index()), outfile)
+
+
+def _replace_rows(old: pd.DataFrame | None, new: pd.DataFrame) -> pd.DataFrame:
+    """Replace the rows of a rollup for the periods in another."""
+    if old is None:
+        return new
+    return pd.concat([old[~old.index.isin(new.index)], new])
+
+
+def _merge_hourly(
+    old: pd.DataFrame | None, new: pd.DataFrame, overwrite: bool
+) -> pd.DataFrame:
+    """Merge new hourly rows into the saved ones.
+
+    With overwrite the new rows replace the saved rows. Otherwise a new row
+    replaces the saved row when it has at least as many values, so a
+    partial fetch of an hour never replaces a complete one.
+    """
+    if old is None or overwrite:
+        return _replace_rows(old, new)
+    saved_counts = old["count"].reindex(new.index)
+    return _replace_rows(old, new[~(saved_counts > new["count"])])
+
+
+def update_rollups(
+    top_level: pathlib.Path,
+    location: str,
+    feed: str,
+    df: pd.DataFrame,
+    overwrite: bool = False,
+) -> None:
+    """Add raw data to the saved rollups of a feed.
+
+    The hours of the data are rolled up again from the data and replace the
+    saved hours, so updating with the same data twice gives the same
+    rollups. The daily rollup of every month touched is then rebuilt from
+    the hourly rollup and the monthly rollup of every year touched from the
+    daily rollup, so the three always agree.
+
+    Parameters
+    ----------
+    top_level : pathlib.Path
+        Main directory where the data should be saved.
+    location : str
+        Sensor location.
+    feed : str
+        The name of the feed.
+    df : pd.DataFrame
+        Raw data with a datetime index and the values in the first column.
+    overwrite : bool, optional
+        The data holds every value of its hours, so it always replaces the
+        saved hours, by default False. Otherwise it only replaces saved
+        hours that do not have more values.
+    """
+    hourly = make_rollup(df, "hourly")
+    if hourly.empty:
+        return
+
+    months = sorted(set(zip(hourly.index.year, hourly.index.month)))
+    years = sorted({year for year, _ in months})
+    for year, month in months:
+        period = datetime(year, month, 1)
+        mask = (hourly.index.year == year) & (hourly.index.month == month)
+        hourly_file = rollup_file(top_level, location, feed, "hourly", period)
+        month_hourly = _merge_hourly(_load(hourly_file), hourly[mask], overwrite)
+        _save(month_hourly, hourly_file)
+
+        daily_file = rollup_file(top_level, location, feed, "daily", period)
+        daily = combine_rollups(month_hourly, "daily")
+        _save(_replace_rows(_load(daily_file), daily), daily_file)
+
+    monthly_file = rollup_file(top_level, location, feed, "monthly")
+    monthly = _load(monthly_file)
+    for year in years:
+        daily_file = rollup_file(
+            top_level, location, feed, "daily", datetime(year, 1, 1)
+        )
+        monthly = _replace_rows(monthly, combine_rollups(_load(daily_file), "monthly"))
+    _save(monthly, monthly_file)
@@ -8,26 +8,42 @@ import pathlib
 from zoneinfo import ZoneInfo
 
 from .aio_file import AioFile
-from .stats_maker import StatsMaker
+from .helpers import Bounds, load_bounds
+from .profiling import add_profile_arguments, profile_run
+from .stats_maker import FILE_FORMATS, StatsMaker, process_day
 
 
 def main(opts: argparse.Namespace) -> None:
-    one_day = timedelta(days=1)
-    raw_date = datetime.strptime(opts.date, "%Y-%m-%d").astimezone(
-        ZoneInfo(opts.timezone)
-    )
-    end = raw_date + one_day
+    zone = ZoneInfo(opts.timezone)
 
     feed: str = opts.raw_file.stem.split("-")[0].lower()
     feed = feed.replace("_", "-")
 
     client = AioFile(opts.raw_file)
-    data = client.read_data()
-    tdata = client.transform_data(data, opts.timezone)
     stats = StatsMaker()
-    stats.create_dataframe(tdata, feed)
-    stats.filter_time(raw_date, end)
-    stats.save_raw(opts.output_dir, opts.location)
+    if opts.date is not None:
+        one_day = timedelta(days=1)
+        raw_date = datetime.strptime(opts.date, "%Y-%m-%d").astimezone(zone)
+        end = raw_date + one_day
+        stats.create_dataframe(client.read_range(opts.timezone, raw_date, end), feed)
+        stats.filter_time(raw_date, end)
+        days = [stats]
+    else:
+        # Read the file once and save every day in it.
+        stats.create_dataframe(client.read_table(opts.timezone), feed)
+        days = stats.split_days()
+
+    for day in days:
+        bounds: Bounds | None = None
+        if opts.stats:
+            bounds = load_bounds(
+                opts.output_dir, opts.location, feed, day.timestamp, zone
+            )
+        process_day(
+            day, opts.output_dir, opts.location, bounds, opts.stats, opts.file_format
+        )
+
+    stats.save_rollups(opts.output_dir, opts.location, opts.file_format, from_raw=True)
 
 
 def runner() -> None:
@@ -47,8 +63,29 @@ def runner() -> None:
 
     parser.add_argument("timezone", type=str, help="Set the timezone.")
 
-    parser.add_argument("date", help="Date to save for in YYYY-MM-DD format.")
+    parser.add_argument(
+        "date",
+        nargs="?",
+        help="Date to save for in YYYY-MM-DD format. All days in the file are "
+        "saved if not given.",
+    )
+
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Calculate and save the statistics for each day as well.",
+    )
+
+    parser.add_argument(
+        "--file-format",
+        choices=FILE_FORMATS,
+        default="parquet",
+        help="Format of the raw and statistics files.",
+    )
+
+    add_profile_arguments(parser)
 
     args = parser.parse_args()
 
-    main(args)
+    with profile_run(args):
+        main(args)
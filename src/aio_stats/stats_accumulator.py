@@ -0,0 +1,388 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for keeping running statistics as data arrives."""
+
+from datetime import datetime
+import json
+import math
+import pathlib
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .stats_engine import compute_stats
+
+__all__ = ["QuantileSketch", "StatsAccumulator"]
+
+
+class QuantileSketch:
+
+    def __init__(self, relative_accuracy: float = 0.005) -> None:
+        """Class constructor.
+
+        The sketch keeps counts in logarithmically sized bins, so any quantile
+        is known to within the relative accuracy and two sketches merge by
+        adding their counts.
+
+        Parameters
+        ----------
+        relative_accuracy : float, optional
+            Relative accuracy of the quantiles, by default 0.005
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _add_bins(self, bins: dict[int, int], values: np.ndarray) -> None:
+        """Add the magnitudes of values to a set of bins."""
+        keys = np.ceil(np.log(values) / math.log(self.gamma)).astype(np.int64)
+        for key, count in zip(*np.unique(keys, return_counts=True)):
+            bins[int(key)] = bins.get(int(key), 0) + int(count)
+
+    def add(self, values: np.ndarray) -> None:
+        """Add values to the sketch.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values to add. NaN values are ignored.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self._add_bins(self.positive, values[values > 0])
+        self._add_bins(self.negative, -values[values < 0])
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.count += values.size
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add the counts of another sketch with the same accuracy.
+
+        Parameters
+        ----------
+        other : QuantileSketch
+            The sketch to merge.
+        """
+        for bins, other_bins in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for key, count in other_bins.items():
+                bins[key] = bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def _value(self, key: int) -> float:
+        """Return the representative value of a bin."""
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile.
+
+        Parameters
+        ----------
+        q : float
+            The quantile to estimate between 0 and 1.
+
+        Returns
+        -------
+        float
+            The estimated value or NaN for an empty sketch.
+        """
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the sketch as a serializable dictionary."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(k): v for k, v in self.positive.items()},
+            "negative": {str(k): v for k, v in self.negative.items()},
+            "zero_count": self.zero_count,
+        }
+
+    @classmethod
+    def from_dict(cls, info: dict[str, Any]) -> "QuantileSketch":
+        """Create a sketch from a dictionary made by to_dict.
+
+        Parameters
+        ----------
+        info : dict[str, Any]
+            The sketch information.
+
+        Returns
+        -------
+        QuantileSketch
+            The restored sketch.
+        """
+        sketch = cls(info["relative_accuracy"])
+        sketch.positive = {int(k): v for k, v in info["positive"].items()}
+        sketch.negative = {int(k): v for k, v in info["negative"].items()}
+        sketch.zero_count = info["zero_count"]
+        sketch.count = (
+            sum(sketch.positive.values())
+            + sum(sketch.negative.values())
+            + sketch.zero_count
+        )
+        return sketch
+
+
+class StatsAccumulator:
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean (Welford).
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.time_of_min: pd.Timestamp = None
+        self.time_of_max: pd.Timestamp = None
+        # Time of the latest point added, so overlapping data can be dropped.
+        self.last_time: pd.Timestamp = None
+        self.sketch = QuantileSketch()
+
+    def _combine(
+        self,
+        count: int,
+        mean: float,
+        m2: float,
+        v_min: float,
+        v_max: float,
+        time_of_min: pd.Timestamp,
+        time_of_max: pd.Timestamp,
+    ) -> None:
+        """Combine the running statistics with those from other data.
+
+        The other data is assumed to come after the data already seen, so
+        ties for the minimum and maximum keep the earlier time.
+        """
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        if v_min < self.min:
+            self.min = v_min
+            self.time_of_min = time_of_min
+        if v_max > self.max:
+            self.max = v_max
+            self.time_of_max = time_of_max
+
+    def _mark(self, timestamp: pd.Timestamp | None) -> None:
+        """Move the time of the latest point added forward."""
+        if timestamp is not None and (
+            self.last_time is None or timestamp > self.last_time
+        ):
+            self.last_time = timestamp
+
+    def update(self, time: datetime, value: float) -> None:
+        """Add a single data point.
+
+        Parameters
+        ----------
+        time : datetime
+            The time of the data point.
+        value : float
+            The value of the data point. NaN values are ignored.
+        """
+        if math.isnan(value):
+            return
+        timestamp = pd.Timestamp(time)
+        self._combine(1, value, 0.0, value, value, timestamp, timestamp)
+        self._mark(timestamp)
+        self.sketch.add(np.array([value]))
+
+    def update_batch(self, times: pd.DatetimeIndex, values: np.ndarray) -> None:
+        """Add a batch of data points.
+
+        Parameters
+        ----------
+        times : pd.DatetimeIndex
+            The times of the data points in increasing order.
+        values : np.ndarray
+            The values of the data points. NaN values are ignored.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        result = compute_stats(values)
+        if result["count"].size == 0:
+            return
+        count = int(result["count"][0])
+        self._combine(
+            count,
+            float(result["mean"][0]),
+            float(result["var"][0] * (count - 1)) if count > 1 else 0.0,
+            float(result["min"][0]),
+            float(result["max"][0]),
+            times[result["argmin"][0]],
+            times[result["argmax"][0]],
+        )
+        self._mark(times.max())
+        self.sketch.add(values)
+
+    def merge(self, other: "StatsAccumulator") -> None:
+        """Add the statistics from an accumulator of later data.
+
+        Parameters
+        ----------
+        other : StatsAccumulator
+            The accumulator to merge.
+        """
+        self._combine(
+            other.count,
+            other.mean,
+            other.m2,
+            other.min,
+            other.max,
+            other.time_of_min,
+            other.time_of_max,
+        )
+        self._mark(other.last_time)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def var(self) -> float:
+        """The sample variance of the data."""
+        if self.count < 2:
+            return math.nan
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        """The sample standard deviation of the data."""
+        return math.sqrt(self.var)
+
+    @property
+    def median(self) -> float:
+        """The estimated median of the data."""
+        return self.sketch.quantile(0.5)
+
+    def to_table(self, timestamp: datetime) -> pa.Table:
+        """Return the statistics in the same layout as StatsMaker.
+
+        Parameters
+        ----------
+        timestamp : datetime
+            The day of the statistics.
+
+        Returns
+        -------
+        pa.Table
+            The statistics.
+        """
+        stats = {
+            "min": [self.min],
+            "max": [self.max],
+            "mean": [self.mean],
+            "median": [self.median],
+            "std": [self.std],
+            "var": [self.var],
+            "time_of_min": [self.time_of_min],
+            "time_of_max": [self.time_of_max],
+            "day": [timestamp.day],
+        }
+        return pa.Table.from_pydict(stats)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the accumulator as a serializable dictionary."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "time_of_min": (
+                self.time_of_min.isoformat() if self.time_of_min is not None else None
+            ),
+            "time_of_max": (
+                self.time_of_max.isoformat() if self.time_of_max is not None else None
+            ),
+            "last_time": (
+                self.last_time.isoformat() if self.last_time is not None else None
+            ),
+            # The ISO format only keeps the UTC offset of the times.
+            "timezone": (
+                str(self.time_of_min.tz) if self.time_of_min is not None else None
+            ),
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, info: dict[str, Any]) -> "StatsAccumulator":
+        """Create an accumulator from a dictionary made by to_dict.
+
+        Parameters
+        ----------
+        info : dict[str, Any]
+            The accumulator information.
+
+        Returns
+        -------
+        StatsAccumulator
+            The restored accumulator.
+        """
+        accumulator = cls()
+        accumulator.count = info["count"]
+        accumulator.mean = info["mean"]
+        accumulator.m2 = info["m2"]
+        accumulator.min = info["min"]
+        accumulator.max = info["max"]
+        for key in ("time_of_min", "time_of_max", "last_time"):
+            if info.get(key) is not None:
+                timestamp = pd.Timestamp(info[key])
+                if info.get("timezone") is not None:
+                    timestamp = timestamp.tz_convert(info["timezone"])
+                setattr(accumulator, key, timestamp)
+        accumulator.sketch = QuantileSketch.from_dict(info["sketch"])
+        return accumulator
+
+    def save(self, outfile: pathlib.Path) -> None:
+        """Write the accumulator to file.
+
+        Parameters
+        ----------
+        outfile : pathlib.Path
+            The file to write.
+        """
+        with outfile.open("w") as ofile:
+            json.dump(self.to_dict(), ofile)
+
+    @classmethod
+    def load(cls, infile: pathlib.Path) -> "StatsAccumulator":
+        """Read an accumulator from file.
+
+        Parameters
+        ----------
+        infile : pathlib.Path
+            The file to read.
+
+        Returns
+        -------
+        StatsAccumulator
+            The restored accumulator.
+        """
+        with infile.open() as ifile:
+            return cls.from_dict(json.load(ifile))
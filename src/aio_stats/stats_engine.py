@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for calculating statistics over groups of data at once."""
+
+import numpy as np
+
+__all__ = ["compute_stats"]
+
+
+def compute_stats(
+    values: np.ndarray, group_ids: np.ndarray | None = None
+) -> dict[str, np.ndarray]:
+    """Calculate statistics for every group of values in one call.
+
+    The values are sorted once by group and value and all the statistics are
+    taken from the sorted blocks. NaN values are ignored. The variance and
+    standard deviation use one degree of freedom like pandas.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The data values.
+    group_ids : np.ndarray | None, optional
+        Integer group label for each value, by default None (one group)
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Arrays with one entry per group (sorted by group label) for: group,
+        count, min, max, mean, median, std, var, argmin and argmax. The arg
+        entries are the positions of the first occurrence of the minimum and
+        maximum in the input values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if group_ids is None:
+        group_ids = np.zeros(values.size, dtype=np.intp)
+    else:
+        group_ids = np.asarray(group_ids)
+
+    positions = np.flatnonzero(~np.isnan(values))
+    v = values[positions]
+    g = group_ids[positions]
+
+    if v.size == 0:
+        empty = np.array([], dtype=np.float64)
+        empty_int = np.array([], dtype=np.intp)
+        return {
+            "group": g,
+            "count": empty_int,
+            "min": empty,
+            "max": empty,
+            "mean": empty,
+            "median": empty,
+            "std": empty,
+            "var": empty,
+            "argmin": empty_int,
+            "argmax": empty_int,
+        }
+
+    # lexsort is stable, so ties stay in input order.
+    ascending = np.lexsort((v, g))
+    sv = v[ascending]
+    sg = g[ascending]
+    starts = np.flatnonzero(np.r_[True, sg[1:] != sg[:-1]])
+    counts = np.diff(np.r_[starts, sv.size])
+    ends = starts + counts - 1
+
+    v_min = sv[starts]
+    v_max = sv[ends]
+    v_median = (sv[starts + (counts - 1) // 2] + sv[starts + counts // 2]) / 2
+    v_mean = np.add.reduceat(sv, starts) / counts
+    deviations = sv - np.repeat(v_mean, counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v_var = np.add.reduceat(deviations * deviations, starts) / (counts - 1)
+    v_std = np.sqrt(v_var)
+
+    # Sorting on the negated values puts the first maximum at the block start.
+    descending = np.lexsort((-v, g))
+
+    return {
+        "group": sg[starts],
+        "count": counts,
+        "min": v_min,
+        "max": v_max,
+        "mean": v_mean,
+        "median": v_median,
+        "std": v_std,
+        "var": v_var,
+        "argmin": positions[ascending[starts]],
+        "argmax": positions[descending[starts]],
+    }
@@ -2,16 +2,27 @@
 #
 # SPDX-License-Identifier: MIT
 
+from collections.abc import Iterator
 from datetime import datetime
 import pathlib
 
+import numpy as np
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 
-from .helpers import Bounds
+from .compact import compact_month
+from .data_reader import DataReader
+from .helpers import MONTH_FILE, Bounds, read_ipc, write_ipc
+from .profiling import attribute_size, profiled
+from .rollups import period_starts, update_rollups
+from .stats_accumulator import StatsAccumulator
+from .stats_engine import compute_stats
 
-__all__ = ["StatsMaker"]
+__all__ = ["FILE_FORMATS", "StatsMaker", "process_day"]
+
+# Supported data file formats. The name is also the file extension.
+FILE_FORMATS = ("parquet", "arrow")
 
 
 class StatsMaker:
@@ -22,22 +33,31 @@ class StatsMaker:
         self.timestamp: datetime = None
         self.stats: pa.Table = None
 
+    @profiled("StatsMaker.create_dataframe", attribute_size("df"))
     def create_dataframe(
-        self, data: list[tuple[datetime, float]], data_column: str
+        self, data: list[tuple[datetime, float]] | pa.Table, data_column: str
     ) -> None:
         """Take data and create dataframe.
 
         Parameters
         ----------
-        data : list[tuple[datetime, float]]
-            The input data.
+        data : list[tuple[datetime, float]] | pa.Table
+            The input data. A table must have datetime and value columns.
         data_column : str
             The name of the feed for the column.
         """
-        self.df = pd.DataFrame.from_records(
-            data, index="datetime", columns=["datetime", data_column]
-        )
+        if isinstance(data, pa.Table):
+            self.df = (
+                data.to_pandas()
+                .set_index("datetime")
+                .rename(columns={"value": data_column})
+            )
+        else:
+            self.df = pd.DataFrame.from_records(
+                data, index="datetime", columns=["datetime", data_column]
+            )
 
+    @profiled("StatsMaker.filter_time", attribute_size("df"))
     def filter_time(
         self, begin: datetime, end: datetime, day_bound: bool = False
     ) -> None:
@@ -59,6 +79,7 @@ class StatsMaker:
             self.timestamp = begin
         self.df = self.df.loc[self.timestamp : end]
 
+    @profiled("StatsMaker.make_stats", attribute_size("df"))
     def make_stats(self, bounds: Bounds | None) -> None:
         """Calculate statistics from data."""
         if bounds is not None:
@@ -66,22 +87,17 @@ class StatsMaker:
         else:
             df = self.df
         column = df.columns[0]
-        v_min = df.min().values[0]
-        v_max = df.max().values[0]
-        v_mean = df.mean().values[0]
-        v_median = df.median().values[0]
-        v_std = df.std().values[0]
-        v_var = df.var().values[0]
-        time_of_min = df[df[column] == v_min].index.tolist()[0]
-        time_of_max = df[df[column] == v_max].index.tolist()[0]
+        result = compute_stats(df[column].to_numpy(dtype=np.float64))
+        time_of_min = df.index[result["argmin"][0]]
+        time_of_max = df.index[result["argmax"][0]]
 
         stats = {
-            "min": [v_min],
-            "max": [v_max],
-            "mean": [v_mean],
-            "median": [v_median],
-            "std": [v_std],
-            "var": [v_var],
+            "min": result["min"],
+            "max": result["max"],
+            "mean": result["mean"],
+            "median": result["median"],
+            "std": result["std"],
+            "var": result["var"],
             "time_of_min": [time_of_min],
             "time_of_max": [time_of_max],
             "day": [self.timestamp.day],
@@ -89,30 +105,100 @@ class StatsMaker:
 
         self.stats = pa.Table.from_pydict(stats)
 
-    def save_raw(self, top_level: pathlib.Path, sub_path: str) -> None:
-        """Save the raw data to file.
+    def split_days(self) -> Iterator["StatsMaker"]:
+        """Split the data by local calendar day.
+
+        Yields
+        ------
+        StatsMaker
+            Instance holding a single day of the data with the timestamp set
+            to the start of that day.
+        """
+        for day, df in self.df.groupby(self.df.index.normalize()):
+            stats = StatsMaker()
+            stats.df = df
+            stats.timestamp = day.to_pydatetime()
+            yield stats
+
+    def _partition_file(
+        self,
+        kind: str,
+        top_level: pathlib.Path,
+        sub_path: str,
+        suffix: str = ".parquet",
+        create: bool = True,
+    ) -> pathlib.Path:
+        """Create the directory for a data file and return the file name.
 
         Parameters
         ----------
+        kind : str
+            The type of data: raw, stats, provisional or accum.
         top_level : pathlib.Path
             Main directory where the data should be saved.
         sub_path : str
             Sensor location.
+        suffix : str, optional
+            The file extension, by default .parquet
+        create : bool, optional
+            Create the directory, by default True
+
+        Returns
+        -------
+        pathlib.Path
+            The file name for the data.
         """
         tpath = (
             top_level
-            / "raw"
+            / kind
             / sub_path
             / self.df.columns[0]
             / str(self.timestamp.year)
             / f"{self.timestamp.strftime('%m')}"
         )
-        tpath.mkdir(parents=True, exist_ok=True)
-        outfile = tpath / f"{self.timestamp.strftime('%d')}.parquet"
-        self.df.to_parquet(outfile)
+        if create:
+            tpath.mkdir(parents=True, exist_ok=True)
+        return tpath / f"{self.timestamp.strftime('%d')}{suffix}"
 
-    def save_stats(self, top_level: pathlib.Path, sub_path: str) -> None:
-        """Save the calculated statistics to file.
+    def _write(
+        self,
+        table: pa.Table,
+        outfile: pathlib.Path,
+        compact: bool | None,
+        file_format: str,
+    ) -> None:
+        """Write a data file and merge it into the month file if needed.
+
+        Parameters
+        ----------
+        table : pa.Table
+            The data to write.
+        outfile : pathlib.Path
+            The file to write.
+        compact : bool | None
+            Merge the data into the month file. False only merges it when
+            there is a month file already and None never merges it.
+        file_format : str
+            The file format: parquet or arrow.
+        """
+        if file_format == "arrow":
+            write_ipc(table, outfile)
+            return
+        pq.write_table(table, outfile)
+        if compact is None:
+            return
+        if compact or (outfile.parent / MONTH_FILE).exists():
+            compact_month(outfile.parent)
+
+    @profiled("StatsMaker.save_raw", attribute_size("df"))
+    def save_raw(
+        self,
+        top_level: pathlib.Path,
+        sub_path: str,
+        compact: bool | None = False,
+        file_format: str = "parquet",
+    ) -> None:
+        """Save the raw data to file.
 
         Parameters
         ----------
@@ -120,15 +206,202 @@ class StatsMaker:
             Main directory where the data should be saved.
         sub_path : str
             Sensor location.
+        compact : bool | None, optional
+            Merge the data into the month file, by default False. This is
+            always done if the month already has a month file unless None is
+            given, which leaves the compaction to the caller. Only parquet
+            files are compacted.
+        file_format : str, optional
+            The file format, by default parquet. Arrow files are uncompressed
+            Arrow IPC files meant to be memory mapped by readers.
         """
-        tpath = (
-            top_level
-            / "stats"
-            / sub_path
-            / self.df.columns[0]
-            / str(self.timestamp.year)
-            / f"{self.timestamp.strftime('%m')}"
+        outfile = self._partition_file("raw", top_level, sub_path, f".{file_format}")
+        self._write(pa.Table.from_pandas(self.df), outfile, compact, file_format)
+
+    @profiled("StatsMaker.append_raw", attribute_size("df"))
+    def append_raw(
+        self,
+        top_level: pathlib.Path,
+        sub_path: str,
+        compact: bool | None = False,
+        file_format: str = "parquet",
+    ) -> None:
+        """Add the raw data to any already saved for the day.
+
+        Points already in the file are replaced by the new ones.
+
+        Parameters
+        ----------
+        top_level : pathlib.Path
+            Main directory where the data should be saved.
+        sub_path : str
+            Sensor location.
+        compact : bool | None, optional
+            Merge the data into the month file, by default False. This is
+            always done if the month already has a month file unless None is
+            given, which leaves the compaction to the caller. Only parquet
+            files are compacted.
+        file_format : str, optional
+            The file format, by default parquet.
+        """
+        outfile = self._partition_file("raw", top_level, sub_path, f".{file_format}")
+        if outfile.exists():
+            if file_format == "arrow":
+                saved = read_ipc(outfile).to_pandas()
+            else:
+                saved = pd.read_parquet(outfile)
+            df = pd.concat([saved, self.df])
+            self.df = df[~df.index.duplicated(keep="last")].sort_index()
+        self._write(pa.Table.from_pandas(self.df), outfile, compact, file_format)
+
+    @profiled("StatsMaker.save_rollups", attribute_size("df"))
+    def save_rollups(
+        self,
+        top_level: pathlib.Path,
+        sub_path: str,
+        file_format: str = "parquet",
+        from_raw: bool = False,
+    ) -> None:
+        """Add the raw data to the hourly, daily and monthly rollups.
+
+        Parameters
+        ----------
+        top_level : pathlib.Path
+            Main directory where the data should be saved.
+        sub_path : str
+            Sensor location.
+        file_format : str, optional
+            The format of the raw files, by default parquet.
+        from_raw : bool, optional
+            Roll up the hours of the data from all the saved raw data,
+            by default False. Use this after the raw data has been saved, so
+            the rollups match it whatever was saved before. Otherwise the
+            data replaces the saved hours that do not have more values.
+        """
+        feed = self.df.columns[0]
+        if not from_raw:
+            update_rollups(top_level, sub_path, feed, self.df)
+            return
+        if self.df.empty:
+            return
+        hours = period_starts(self.df.index, "hourly")
+        reader = DataReader(
+            top_level / "raw" / sub_path / feed, file_format=file_format
+        )
+        reader.query(
+            hours.min(), hours.max() + pd.Timedelta(hours=1), ["datetime", feed]
         )
-        tpath.mkdir(parents=True, exist_ok=True)
-        outfile = tpath / f"{self.timestamp.strftime('%d')}.parquet"
-        pq.write_table(self.stats, outfile)
+        df = reader.table.to_pandas(ignore_metadata=True).set_index("datetime")
+        df = df[~df.index.duplicated(keep="last")]
+        update_rollups(top_level, sub_path, feed, df, overwrite=True)
+
+    @profiled("StatsMaker.accumulate", attribute_size("df"))
+    def accumulate(self, top_level: pathlib.Path, sub_path: str) -> None:
+        """Add the data to the running statistics for the day.
+
+        The running statistics are saved and the provisional statistics for
+        the day are set, so they can be saved with save_stats. Points at or
+        before the latest point already added are skipped, so overlapping
+        data is only counted once.
+
+        Parameters
+        ----------
+        top_level : pathlib.Path
+            Main directory where the data should be saved.
+        sub_path : str
+            Sensor location.
+        """
+        outfile = self._partition_file("accum", top_level, sub_path, ".json")
+        if outfile.exists():
+            accumulator = StatsAccumulator.load(outfile)
+        else:
+            accumulator = StatsAccumulator()
+        df = self.df
+        if accumulator.last_time is not None:
+            df = df.loc[df.index > accumulator.last_time]
+        column = df.columns[0]
+        accumulator.update_batch(df.index, df[column].to_numpy(dtype=np.float64))
+        accumulator.save(outfile)
+        self.stats = accumulator.to_table(self.timestamp)
+
+    @profiled("StatsMaker.save_stats", attribute_size("stats"))
+    def save_stats(
+        self,
+        top_level: pathlib.Path,
+        sub_path: str,
+        compact: bool | None = False,
+        file_format: str = "parquet",
+        provisional: bool = False,
+    ) -> None:
+        """Save the calculated statistics to file.
+
+        Parameters
+        ----------
+        top_level : pathlib.Path
+            Main directory where the data should be saved.
+        sub_path : str
+            Sensor location.
+        compact : bool | None, optional
+            Merge the statistics into the month file, by default False. This
+            is always done if the month already has a month file unless None
+            is given, which leaves the compaction to the caller. Only parquet
+            files are compacted.
+        file_format : str, optional
+            The file format, by default parquet.
+        provisional : bool, optional
+            The statistics are for a partial day, by default False. They are
+            saved under provisional instead of stats and are never compacted.
+            Saving the final statistics removes the provisional ones.
+        """
+        suffix = f".{file_format}"
+        if provisional:
+            outfile = self._partition_file("provisional", top_level, sub_path, suffix)
+            self._write(self.stats, outfile, False, file_format)
+            return
+        outfile = self._partition_file("stats", top_level, sub_path, suffix)
+        self._write(self.stats, outfile, compact, file_format)
+        self._partition_file(
+            "provisional", top_level, sub_path, suffix, create=False
+        ).unlink(missing_ok=True)
+
+
+def process_day(
+    stats: StatsMaker,
+    output_dir: pathlib.Path,
+    location: str,
+    bounds: Bounds | None,
+    make_stats: bool = True,
+    file_format: str = "parquet",
+    compact: bool | None = False,
+) -> str:
+    """Save the raw data and statistics for a single day.
+
+    Parameters
+    ----------
+    stats : StatsMaker
+        Instance holding a single day of data.
+    output_dir : pathlib.Path
+        Main directory where the data should be saved.
+    location : str
+        Sensor location.
+    bounds : Bounds | None
+        The time bounds for the statistics if the feed requires it.
+    make_stats : bool, optional
+        Calculate and save the statistics, by default True
+    file_format : str, optional
+        The file format, by default parquet
+    compact : bool | None, optional
+        Merge the data into the month files, by default False. See
+        StatsMaker.save_raw. Use None when days of the same month are
+        processed in parallel and compact the months afterwards.
+
+    Returns
+    -------
+    str
+        Description of the processed day.
+    """
+    stats.save_raw(output_dir, location, compact, file_format)
+    if make_stats:
+        stats.make_stats(bounds)
+        stats.save_stats(output_dir, location, compact, file_format)
+    return f"{location}.{stats.df.columns[0]} {stats.timestamp.date()}"
@@ -0,0 +1,137 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+"""Module for caching tables read from disk."""
+
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+import pathlib
+import threading
+
+import pyarrow as pa
+
+__all__ = ["TABLE_CACHE", "TableCache"]
+
+# Extensions of the files holding data.
+DATA_SUFFIXES = (".parquet", ".arrow")
+
+Fingerprint = tuple[tuple[str, int, int], ...]
+
+
+class TableCache:
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """Class constructor.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Maximum total size of the cached tables, by default 256 MiB
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[Hashable, tuple[Fingerprint, pa.Table]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(sources: Iterable[pathlib.Path]) -> Fingerprint:
+        """Return the path, modification time and size of the data files.
+
+        Only the given files and the files directly in the given directories
+        are looked at, so a lookup costs one stat per file the read uses.
+
+        Parameters
+        ----------
+        sources : Iterable[pathlib.Path]
+            The data files and the directories holding data files that a
+            read uses.
+
+        Returns
+        -------
+        Fingerprint
+            Information for every data file, which changes whenever a file is
+            written, added or removed.
+        """
+        info = []
+        for source in sources:
+            if source.is_dir():
+                files = sorted(
+                    path
+                    for path in source.iterdir()
+                    if path.suffix in DATA_SUFFIXES and not path.name.startswith(".")
+                )
+            elif source.exists():
+                files = [source]
+            else:
+                continue
+            for data_file in files:
+                stat = data_file.stat()
+                info.append((str(data_file), stat.st_mtime_ns, stat.st_size))
+        return tuple(info)
+
+    def get(self, key: Hashable, fingerprint: Fingerprint) -> pa.Table | None:
+        """Return a cached table if the data files have not changed.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifier of the read.
+        fingerprint : Fingerprint
+            The current information for the data files.
+
+        Returns
+        -------
+        pa.Table | None
+            The cached table or None if there is no valid entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != fingerprint:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, fingerprint: Fingerprint, table: pa.Table) -> None:
+        """Add a table to the cache.
+
+        The least recently used tables are dropped to stay within the size
+        limit. Tables larger than the limit are not cached.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifier of the read.
+        fingerprint : Fingerprint
+            The information for the data files the table was read from.
+        table : pa.Table
+            The table to cache.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if table.nbytes <= self.max_bytes:
+                self._entries[key] = (fingerprint, table)
+                self.nbytes += table.nbytes
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Remove all tables from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry. The lock must be held."""
+        _, table = self._entries.pop(key)
+        self.nbytes -= table.nbytes
+
+
+# Cache shared by all DataReader instances in a process.
+TABLE_CACHE = TableCache()
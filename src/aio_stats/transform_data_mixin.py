@@ -6,12 +6,17 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from Adafruit_IO import Data
+import pandas as pd
+import pyarrow as pa
+
+from .profiling import profiled, result_size
 
 __all__ = ["TransformDataMixin"]
 
 
 class TransformDataMixin:
 
+    @profiled("transform_data", result_size)
     def transform_data(
         self, data: list[Data], timezone: str
     ) -> list[tuple[datetime, float | str]]:
@@ -39,3 +44,33 @@ class TransformDataMixin:
                 v = x.value
             tdata.append((t, v))
         return tdata
+
+    @profiled("transform_data_columnar", result_size)
+    def transform_data_columnar(self, data: list[Data], timezone: str) -> pa.Table:
+        """Simplify data from that retrieved from Adafruit IO into columns.
+
+        All the timestamps and values are converted at once. Values that
+        are not numeric become nulls.
+
+        Parameters
+        ----------
+        data : list[Data]
+            List of data points.
+        timezone : str
+            Time zone for the data point translation.
+
+        Returns
+        -------
+        pa.Table
+            Table with datetime and value columns.
+        """
+        times = pd.to_datetime(
+            [x.created_at for x in data], utc=True, format="ISO8601"
+        ).tz_convert(timezone)
+        values = pd.to_numeric(pd.Series([x.value for x in data]), errors="coerce")
+        return pa.table(
+            {
+                "datetime": pa.array(times),
+                "value": pa.array(values.to_numpy(dtype="float64"), from_pandas=True),
+            }
+        )
@@ -0,0 +1,46 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+import pytest
+
+pytest.importorskip("plotly")
+
+from aio_stats.plotting.downsample import lttb  # noqa: E402
+
+
+def test_short_series() -> None:
+    x = np.arange(10.0)
+    np.testing.assert_array_equal(lttb(x, x, 10), np.arange(10))
+
+
+def test_selection() -> None:
+    rng = np.random.default_rng(0)
+    x = np.arange(10000.0)
+    y = rng.normal(size=x.size)
+    selected = lttb(x, y, 500)
+    assert selected.size == 500
+    assert selected[0] == 0
+    assert selected[-1] == x.size - 1
+    assert (np.diff(selected) > 0).all()
+    # One point comes from each bucket between the end points.
+    edges = np.linspace(1, x.size - 1, 499).astype(np.intp)
+    buckets = np.searchsorted(edges, selected[1:-1], side="right") - 1
+    np.testing.assert_array_equal(buckets, np.arange(498))
+
+
+def test_keep_spikes() -> None:
+    x = np.arange(1000.0)
+    y = np.zeros(x.size)
+    y[[123, 456, 789]] = [5.0, -5.0, 3.0]
+    selected = lttb(x, y, 20)
+    assert {123, 456, 789} <= set(selected.tolist())
+
+
+def test_time_values() -> None:
+    x = np.arange("2025-01-01", "2025-01-08", dtype="datetime64[m]")
+    y = np.sin(np.arange(x.size) / 100.0)
+    selected = lttb(x.astype(np.int64), y, 100)
+    assert selected.size == 100
+    assert y[selected].max() == pytest.approx(1.0, abs=1e-3)
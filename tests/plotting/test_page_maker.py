@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import pathlib
+
+import pytest
+
+pytest.importorskip("jinja2")
+pytest.importorskip("plotly")
+
+from aio_stats.plotting.page_maker import build_site  # noqa: E402
+
+
+@pytest.fixture
+def site(tmp_path: pathlib.Path) -> pathlib.Path:
+    for month, location in [("01", "office"), ("02", "office"), ("02", "garage")]:
+        month_dir = tmp_path / "2025" / month
+        month_dir.mkdir(parents=True, exist_ok=True)
+        (month_dir / f"{location}_env.html").write_text("<html></html>")
+    return tmp_path
+
+
+def relative(site: pathlib.Path, pages: list[pathlib.Path]) -> list[str]:
+    return sorted(str(page.relative_to(site)) for page in pages)
+
+
+def test_build_site(site: pathlib.Path) -> None:
+    assert relative(site, build_site(site)) == [
+        "2025/01/index.html",
+        "2025/02/index.html",
+        "2025/index.html",
+        "index.html",
+    ]
+    month_page = (site / "2025" / "02" / "index.html").read_text()
+    assert "garage_env.html" in month_page
+    assert "office_env.html" in month_page
+    assert "February" in (site / "2025" / "index.html").read_text()
+
+
+def test_incremental_rebuild(site: pathlib.Path) -> None:
+    build_site(site)
+    assert build_site(site) == []
+
+    (site / "2025" / "02" / "attic_env.html").write_text("<html></html>")
+    assert relative(site, build_site(site)) == ["2025/02/index.html"]
+    assert "attic_env.html" in (site / "2025" / "02" / "index.html").read_text()
+
+    (site / "2025" / "03").mkdir()
+    (site / "2025" / "03" / "office_env.html").write_text("<html></html>")
+    assert relative(site, build_site(site)) == [
+        "2025/03/index.html",
+        "2025/index.html",
+    ]
+
+
+def test_missing_page_and_force(site: pathlib.Path) -> None:
+    build_site(site)
+    (site / "index.html").unlink()
+    assert relative(site, build_site(site)) == ["index.html"]
+    assert len(build_site(site, force=True)) == 4
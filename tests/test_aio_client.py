@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+from unittest import mock
+
+from Adafruit_IO import ThrottlingError
+import pytest
+
+from aio_stats import aio_client
+from aio_stats.aio_client import AioClient
+
+CREDENTIALS = {"AIO_USERNAME": "user", "AIO_KEY": "key"}
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> AioClient:
+    monkeypatch.setattr(aio_client, "RETRY_DELAY", 0.001)
+    with mock.patch.object(AioClient, "_get_credentials", return_value=CREDENTIALS):
+        yield AioClient()
+
+
+def test_retry_throttled_request(client: AioClient) -> None:
+    method = mock.Mock(side_effect=[ThrottlingError(), ThrottlingError(), "data"])
+    assert client._request(method, "feed") == "data"
+    assert method.call_count == 3
+
+
+def test_give_up_on_throttled_request(client: AioClient) -> None:
+    method = mock.Mock(side_effect=ThrottlingError())
+    with pytest.raises(ThrottlingError):
+        client._request(method)
+    assert method.call_count == aio_client.MAX_RETRIES + 1
+
+
+@pytest.mark.parametrize("rate_limit", [0, -1.0])
+def test_reject_rate_limit(rate_limit: float) -> None:
+    with mock.patch.object(AioClient, "_get_credentials", return_value=CREDENTIALS):
+        with pytest.raises(ValueError):
+            AioClient(rate_limit=rate_limit)
@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import argparse
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+import pathlib
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from Adafruit_IO import Data
+import pyarrow.parquet as pq
+import pytest
+
+from aio_stats import backfill
+from aio_stats.aio_client import AioClient
+from aio_stats.compact import compact_month
+from aio_stats.data_reader import DataReader
+from aio_stats.helpers import MONTH_FILE
+
+LOCATION = "office"
+FEED = "temperature"
+TIMEZONE = "America/New_York"
+
+# Five minute data for the first days of the year in the local time zone.
+FIRST = datetime(2025, 1, 1, 5, tzinfo=timezone.utc)
+DELAY = timedelta(minutes=5)
+FEED_DAYS = 30
+PAGE_SIZE = 100
+
+
+def fake_range(feed: str, start: datetime, end: datetime) -> Iterator[list[Data]]:
+    """Page through the fake feed newest first like Adafruit IO."""
+    points = []
+    current = FIRST
+    while current < FIRST + timedelta(days=FEED_DAYS):
+        if start <= current < end:
+            value = 60 + (current.hour * 7 + current.minute) % 13
+            points.append(
+                Data(
+                    value=str(value),
+                    created_at=current.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                )
+            )
+        current += DELAY
+    while points:
+        yield points[-PAGE_SIZE:]
+        points = points[:-PAGE_SIZE]
+
+
+@pytest.fixture
+def client() -> AioClient:
+    credentials = {"AIO_USERNAME": "user", "AIO_KEY": "key"}
+    with (
+        mock.patch.object(AioClient, "_get_credentials", return_value=credentials),
+        mock.patch.object(AioClient, "fetch_range", side_effect=fake_range),
+    ):
+        yield AioClient()
+
+
+def options(output_dir: pathlib.Path, **kwargs: object) -> argparse.Namespace:
+    opts = {
+        "output_dir": output_dir,
+        "start": "2025-01-01",
+        "end": "2025-01-03",
+        "timezone": TIMEZONE,
+        "location": [LOCATION],
+        "raw_file": None,
+        "no_stats": False,
+        "file_format": "parquet",
+        "workers": 1,
+        "rate_limit": None,
+    }
+    opts.update(kwargs)
+    return argparse.Namespace(**opts)
+
+
+def test_fetch_days(client: AioClient) -> None:
+    start = FIRST.astimezone(ZoneInfo(TIMEZONE))
+    days = list(
+        backfill.fetch_days(
+            client, LOCATION, FEED, start, start + timedelta(days=3), TIMEZONE
+        )
+    )
+    assert [day.timestamp.day for day in days] == [3, 2, 1]
+    for day in days:
+        assert len(day.df) == 288
+        assert day.df.index.is_monotonic_increasing
+        assert (day.df.index.normalize() == day.timestamp).all()
+
+
+def test_backfill(client: AioClient, tmp_path: pathlib.Path) -> None:
+    with mock.patch.object(backfill, "AioClient", return_value=client):
+        backfill.main(options(tmp_path))
+
+    reader = DataReader(tmp_path / "raw" / LOCATION / FEED / "2025" / "01")
+    reader.read_month()
+    assert reader.table.num_rows == 288 * 3
+    stats_dir = tmp_path / "stats" / LOCATION / FEED / "2025" / "01"
+    assert sorted(x.name for x in stats_dir.iterdir()) == [
+        "01.parquet",
+        "02.parquet",
+        "03.parquet",
+    ]
+
+    reader = DataReader(tmp_path / "rollups" / LOCATION / FEED)
+    reader.read_rollups("daily")
+    counts = reader.table.to_pandas(ignore_metadata=True)["count"]
+    assert counts.tolist() == [288] * 3
+
+
+def test_parallel_backfill_into_compacted_month(
+    client: AioClient, tmp_path: pathlib.Path
+) -> None:
+    opts = options(tmp_path, end=f"2025-01-{FEED_DAYS:02d}")
+    month = pathlib.Path(LOCATION, FEED, "2025", "01")
+    with mock.patch.object(backfill, "AioClient", return_value=client):
+        backfill.main(opts)
+        for kind in ["raw", "stats"]:
+            compact_month(tmp_path / kind / month)
+        opts.workers = 8
+        backfill.main(opts)
+
+    for kind in ["raw", "stats"]:
+        month_dir = tmp_path / kind / month
+        assert [x.name for x in month_dir.iterdir()] == [MONTH_FILE]
+    raw = pq.read_table(tmp_path / "raw" / month / MONTH_FILE)
+    assert raw.num_rows == 288 * FEED_DAYS
+    stats = pq.read_table(tmp_path / "stats" / month / MONTH_FILE)
+    assert stats.num_rows == FEED_DAYS
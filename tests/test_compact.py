@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import pathlib
+from unittest import mock
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+
+from aio_stats import compact
+from aio_stats.compact import compact_month
+from aio_stats.helpers import MONTH_FILE
+
+TIMEZONE = "America/New_York"
+
+
+def raw_day(day: int, value: float) -> pa.Table:
+    times = pd.date_range(
+        f"2025-01-{day:02d}", periods=288, freq="5min", tz=TIMEZONE, name="datetime"
+    )
+    df = pd.DataFrame({"temperature": value}, index=times)
+    return pa.Table.from_pandas(df)
+
+
+@pytest.fixture
+def month_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    month_dir = tmp_path / "raw" / "office" / "temperature" / "2025" / "01"
+    month_dir.mkdir(parents=True)
+    for day in [1, 2, 3]:
+        day_file = month_dir / f"{day:02d}.parquet"
+        pq.write_table(raw_day(day, 60.0), day_file)
+        # File times are coarse, so make a later write stand out.
+        os.utime(day_file, ns=(0, 0))
+    return month_dir
+
+
+def test_compact_month(month_dir: pathlib.Path) -> None:
+    assert compact_month(month_dir) == month_dir / MONTH_FILE
+    assert [x.name for x in month_dir.iterdir()] == [MONTH_FILE]
+    table = pq.read_table(month_dir / MONTH_FILE)
+    assert table.num_rows == 288 * 3
+    assert pq.ParquetFile(month_dir / MONTH_FILE).metadata.num_row_groups == 3
+    assert compact_month(month_dir) is None
+
+
+def test_day_files_win(month_dir: pathlib.Path) -> None:
+    compact_month(month_dir)
+    # Half of day 2 again with new values and the next day.
+    pq.write_table(raw_day(2, 70.0).slice(144), month_dir / "02.parquet")
+    pq.write_table(raw_day(4, 60.0), month_dir / "04.parquet")
+    compact_month(month_dir)
+
+    df = pd.read_parquet(month_dir / MONTH_FILE)
+    assert len(df) == 288 * 4
+    assert df.index.is_unique
+    assert df.index.is_monotonic_increasing
+    assert (df["temperature"] == 70.0).sum() == 144
+    assert (df.loc["2025-01-02 12:00":"2025-01-02 23:59", "temperature"] == 70.0).all()
+
+
+def test_stats_dedup(tmp_path: pathlib.Path) -> None:
+    month_dir = tmp_path / "stats" / "office" / "temperature" / "2025" / "01"
+    month_dir.mkdir(parents=True)
+    pq.write_table(
+        pa.table({"mean": [1.0, 2.0], "day": [1, 2]}), month_dir / MONTH_FILE
+    )
+    pq.write_table(pa.table({"mean": [5.0], "day": [2]}), month_dir / "02.parquet")
+    compact_month(month_dir)
+
+    table = pq.read_table(month_dir / MONTH_FILE)
+    assert table.to_pydict() == {"mean": [1.0, 5.0], "day": [1, 2]}
+
+
+def test_one_row_group_per_day(month_dir: pathlib.Path) -> None:
+    compact_month(month_dir)
+    dataset = ds.dataset(month_dir / MONTH_FILE)
+    times = ds.field("datetime")
+    start = pd.Timestamp("2025-01-02 06:00", tz=TIMEZONE)
+    day_filter = (times >= start) & (times < start + pd.Timedelta(hours=6))
+    (fragment,) = dataset.get_fragments()
+    assert len(fragment.split_by_row_group(day_filter)) == 1
+
+
+def test_keep_rewritten_day_file(month_dir: pathlib.Path) -> None:
+    write_compacted = compact.write_compacted
+
+    def rewrite_day(table: pa.Table, outfile: pathlib.Path) -> None:
+        # Another writer saves day 3 again while the month is written.
+        write_compacted(table, outfile)
+        pq.write_table(raw_day(3, 80.0), month_dir / "03.parquet")
+
+    with mock.patch.object(compact, "write_compacted", side_effect=rewrite_day):
+        compact_month(month_dir)
+
+    assert sorted(x.name for x in month_dir.iterdir()) == ["03.parquet", MONTH_FILE]
+    compact_month(month_dir)
+    df = pd.read_parquet(month_dir / MONTH_FILE)
+    assert (df["temperature"] == 80.0).sum() == 288
+
+
+def test_no_temporary_files_left(
+    month_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(compact, "day_slices", mock.Mock(side_effect=OSError))
+    with pytest.raises(OSError):
+        compact_month(month_dir)
+    assert sorted(x.name for x in month_dir.iterdir()) == [
+        "01.parquet",
+        "02.parquet",
+        "03.parquet",
+    ]
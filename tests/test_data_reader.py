@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+from datetime import datetime
+import pathlib
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aio_stats.compact import compact_month
+from aio_stats.data_reader import DataReader
+from aio_stats.stats_maker import StatsMaker
+
+LOCATION = "office"
+FEED = "temperature"
+ZONE = ZoneInfo("America/New_York")
+
+
+@pytest.fixture
+def output_dir(tmp_path: pathlib.Path) -> pathlib.Path:
+    times = pd.date_range(
+        "2025-01-01", "2025-02-28 23:55", freq="5min", tz=ZONE, name="datetime"
+    )
+    values = 60 + np.arange(times.size) % 13
+    stats = StatsMaker()
+    stats.df = pd.DataFrame({FEED: values.astype(np.float64)}, index=times)
+    for day in stats.split_days():
+        day.save_raw(tmp_path, LOCATION)
+        day.make_stats(None)
+        day.save_stats(tmp_path, LOCATION)
+    return tmp_path
+
+
+def test_query_raw(output_dir: pathlib.Path) -> None:
+    reader = DataReader(output_dir / "raw" / LOCATION / FEED)
+    start = datetime(2025, 1, 31, 12, tzinfo=ZONE)
+    reader.query(start, datetime(2025, 2, 1, 12, tzinfo=ZONE), ["datetime", FEED])
+    times = reader.table.column("datetime").to_pandas()
+    assert reader.table.num_rows == 288
+    assert times.min() == start
+    assert times.max() == pd.Timestamp("2025-02-01 11:55", tz=ZONE)
+
+
+def test_query_skips_other_months(output_dir: pathlib.Path) -> None:
+    # A file that cannot be read shows the month is never opened.
+    feed_dir = output_dir / "raw" / LOCATION / FEED
+    (feed_dir / "2025" / "03").mkdir()
+    (feed_dir / "2025" / "03" / "01.parquet").write_bytes(b"not parquet")
+
+    reader = DataReader(feed_dir)
+    reader.query(datetime(2025, 1, 10, tzinfo=ZONE), datetime(2025, 1, 11, tzinfo=ZONE))
+    assert reader.table.num_rows == 288
+    assert set(reader.table.column("month").to_pylist()) == {1}
+
+
+def test_query_compacted_month(output_dir: pathlib.Path) -> None:
+    feed_dir = output_dir / "raw" / LOCATION / FEED
+    compact_month(feed_dir / "2025" / "01")
+    start = datetime(2025, 1, 31, 12, tzinfo=ZONE)
+    end = datetime(2025, 2, 1, 12, tzinfo=ZONE)
+
+    reader = DataReader(feed_dir)
+    reader.query(start, end, ["datetime", FEED])
+    assert reader.table.num_rows == 288
+    assert reader.table.column("datetime").to_pandas().is_monotonic_increasing
+
+
+def test_query_stats(output_dir: pathlib.Path) -> None:
+    reader = DataReader(output_dir / "stats" / LOCATION / FEED)
+    # A partial end day is included and an end at midnight is not.
+    reader.query(
+        datetime(2025, 1, 30, tzinfo=ZONE), datetime(2025, 2, 2, 6, tzinfo=ZONE)
+    )
+    days = list(zip(reader.table["month"].to_pylist(), reader.table["day"].to_pylist()))
+    assert sorted(days) == [(1, 30), (1, 31), (2, 1), (2, 2)]
+
+    reader.query(datetime(2025, 1, 30, tzinfo=ZONE), datetime(2025, 2, 1, tzinfo=ZONE))
+    assert sorted(reader.table["day"].to_pylist()) == [30, 31]
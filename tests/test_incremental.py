@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import argparse
+import pathlib
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pandas as pd
+import pytest
+from Adafruit_IO import Data
+
+from aio_stats import collect_stats
+from aio_stats.aio_client import AioClient
+from aio_stats.data_reader import DataReader
+from aio_stats.feed_state import FeedState
+
+LOCATION = "office"
+FEED = "temperature"
+TIMEZONE = "America/New_York"
+
+# Points are generated every DELAY between FIRST and the current time.
+FIRST = datetime(2024, 12, 30, tzinfo=timezone.utc)
+DELAY = timedelta(minutes=5)
+
+
+class FakeFeed:
+    """Stand in for Adafruit IO with a fixed five minute feed."""
+
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def fetch_window(self, feed: str, start: datetime, end: datetime) -> list[Data]:
+        points = []
+        current = FIRST
+        while current < self.now:
+            if start <= current < end:
+                value = 60 + (current.hour * 7 + current.minute) % 13
+                points.append(
+                    Data(
+                        value=str(value),
+                        created_at=current.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    )
+                )
+            current += DELAY
+        return points
+
+    def datetime(self) -> type[datetime]:
+        feed = self
+
+        class FakeDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):  # type: ignore[no-untyped-def]
+                return feed.now.astimezone(tz)
+
+        return FakeDatetime
+
+
+@pytest.fixture
+def fake_feed(monkeypatch: pytest.MonkeyPatch) -> FakeFeed:
+    monkeypatch.setenv("TZ", TIMEZONE)
+    time.tzset()
+    feed = FakeFeed(datetime(2025, 1, 3, 5, 30, tzinfo=timezone.utc))
+    credentials = {"AIO_USERNAME": "user", "AIO_KEY": "key"}
+    with (
+        mock.patch.object(AioClient, "_get_credentials", return_value=credentials),
+        mock.patch.object(AioClient, "fetch_window", feed.fetch_window),
+        mock.patch.object(collect_stats, "datetime", feed.datetime()),
+    ):
+        yield feed
+    monkeypatch.undo()
+    time.tzset()
+
+
+def options(output_dir: pathlib.Path, **kwargs: object) -> argparse.Namespace:
+    opts = {
+        "output_dir": output_dir,
+        "timezone": TIMEZONE,
+        "day_bound": True,
+        "location": LOCATION,
+        "calc_points": False,
+        "old_date": None,
+        "window": False,
+        "incremental": False,
+        "compact": False,
+        "file_format": "parquet",
+        "state_file": None,
+        "workers": 1,
+        "rate_limit": None,
+    }
+    opts.update(kwargs)
+    return argparse.Namespace(**opts)
+
+
+def daily_counts(output_dir: pathlib.Path) -> pd.Series:
+    reader = DataReader(output_dir / "rollups" / LOCATION / FEED)
+    reader.read_rollups("daily")
+    df = reader.table.to_pandas(ignore_metadata=True)
+    return df.set_index("period")["count"]
+
+
+def test_nightly_then_incremental(fake_feed: FakeFeed, tmp_path: pathlib.Path) -> None:
+    collect_stats.main(options(tmp_path, old_date="2025-01-02", window=True))
+    stats_file = tmp_path / "stats" / LOCATION / FEED / "2025" / "01" / "02.parquet"
+    nightly_stats = pd.read_parquet(stats_file)
+    nightly_counts = daily_counts(tmp_path)
+    assert nightly_counts.iloc[-1] == 288
+
+    # The first incremental run starts at the last nightly point and a
+    # second one with a stale state fetches saved points again.
+    collect_stats.main(options(tmp_path, incremental=True))
+    for kind in ["provisional", "accum"]:
+        day_files = (tmp_path / kind / LOCATION / FEED / "2025" / "01").glob("02.*")
+        assert not list(day_files)
+    state = FeedState(tmp_path / "collect_state.json")
+    for feed_key in state.marks:
+        state.update(feed_key, state.get(feed_key) - timedelta(minutes=20))
+    state.save()
+    fake_feed.now += timedelta(hours=1)
+    collect_stats.main(options(tmp_path, incremental=True))
+
+    counts = daily_counts(tmp_path)
+    assert counts.loc[nightly_counts.index[-1]] == 288
+    raw = pd.read_parquet(
+        tmp_path / "raw" / LOCATION / FEED / "2025" / "01" / "03.parquet"
+    )
+    assert counts.iloc[-1] == len(raw) == raw.index.nunique()
+
+    pd.testing.assert_frame_equal(pd.read_parquet(stats_file), nightly_stats)
+    provisional_dir = tmp_path / "provisional" / LOCATION / FEED / "2025" / "01"
+    assert (provisional_dir / "03.parquet").exists()
+    assert not (
+        tmp_path / "stats" / LOCATION / FEED / "2025" / "01" / "03.parquet"
+    ).exists()
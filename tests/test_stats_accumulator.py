@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aio_stats.stats_accumulator import QuantileSketch, StatsAccumulator
+
+
+@pytest.fixture
+def data() -> pd.Series:
+    rng = np.random.default_rng(0)
+    times = pd.date_range("2025-01-02", periods=288, freq="5min", tz="America/New_York")
+    return pd.Series(rng.normal(60.0, 5.0, times.size).round(2), index=times)
+
+
+def test_update_batch(data: pd.Series) -> None:
+    accumulator = StatsAccumulator()
+    accumulator.update_batch(data.index, data.to_numpy())
+    assert accumulator.count == data.size
+    assert accumulator.mean == pytest.approx(data.mean())
+    assert accumulator.var == pytest.approx(data.var())
+    assert accumulator.min == data.min()
+    assert accumulator.max == data.max()
+    assert accumulator.time_of_min == data.idxmin()
+    assert accumulator.time_of_max == data.idxmax()
+    assert accumulator.last_time == data.index[-1]
+    assert accumulator.median == pytest.approx(data.median(), rel=0.01)
+
+
+def test_merge(data: pd.Series) -> None:
+    whole = StatsAccumulator()
+    whole.update_batch(data.index, data.to_numpy())
+    first = StatsAccumulator()
+    first.update_batch(data.index[:100], data.to_numpy()[:100])
+    second = StatsAccumulator()
+    for time, value in data.iloc[100:].items():
+        second.update(time, value)
+
+    first.merge(second)
+    assert first.count == whole.count
+    assert first.mean == pytest.approx(whole.mean)
+    assert first.m2 == pytest.approx(whole.m2)
+    assert (first.min, first.max) == (whole.min, whole.max)
+    assert (first.time_of_min, first.time_of_max) == (
+        whole.time_of_min,
+        whole.time_of_max,
+    )
+    assert first.last_time == whole.last_time
+    assert first.sketch.to_dict() == whole.sketch.to_dict()
+
+
+def test_round_trip(data: pd.Series, tmp_path: pathlib.Path) -> None:
+    accumulator = StatsAccumulator()
+    accumulator.update_batch(data.index, data.to_numpy())
+    outfile = tmp_path / "02.json"
+    accumulator.save(outfile)
+
+    restored = StatsAccumulator.load(outfile)
+    assert restored.to_dict() == accumulator.to_dict()
+    assert restored.time_of_min.tz is not None
+    assert str(restored.last_time.tz) == "America/New_York"
+    assert restored.to_table(data.index[0]).equals(accumulator.to_table(data.index[0]))
+
+
+def test_sketch_quantiles() -> None:
+    values = np.r_[np.linspace(-50.0, 150.0, 2001), 0.0, np.nan]
+    sketch = QuantileSketch()
+    sketch.add(values)
+    assert sketch.count == 2002
+    for q in [0.0, 0.1, 0.5, 0.9, 1.0]:
+        expected = np.nanquantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.01, abs=1e-9)
+
+
+def test_sketch_merge_round_trip() -> None:
+    values = np.linspace(-10.0, 10.0, 101)
+    first = QuantileSketch()
+    first.add(values[:50])
+    second = QuantileSketch.from_dict(_sketch(values[50:]).to_dict())
+    first.merge(second)
+    assert first.to_dict() == _sketch(values).to_dict()
+    assert QuantileSketch.from_dict(first.to_dict()).count == values.size
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def _sketch(values: np.ndarray) -> QuantileSketch:
+    sketch = QuantileSketch()
+    sketch.add(values)
+    return sketch
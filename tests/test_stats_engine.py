@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: 2026 Michael Reuter
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aio_stats.stats_engine import compute_stats
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.normal(60.0, 5.0, 1000).round(1)
+    values[rng.choice(values.size, 50, replace=False)] = np.nan
+    groups = rng.integers(0, 7, values.size)
+    return pd.DataFrame({"group": groups, "value": values})
+
+
+def test_single_group(data: pd.DataFrame) -> None:
+    values = data["value"]
+    result = compute_stats(values.to_numpy())
+    assert result["count"][0] == values.count()
+    for name in ["min", "max", "mean", "median", "std", "var"]:
+        assert result[name][0] == pytest.approx(getattr(values, name)())
+    assert result["argmin"][0] == values.idxmin()
+    assert result["argmax"][0] == values.idxmax()
+
+
+def test_groups(data: pd.DataFrame) -> None:
+    result = compute_stats(data["value"].to_numpy(), data["group"].to_numpy())
+    expected = data.groupby("group")["value"]
+    np.testing.assert_array_equal(result["group"], expected.count().index)
+    np.testing.assert_array_equal(result["count"], expected.count())
+    for name in ["min", "max", "mean", "median", "std", "var"]:
+        np.testing.assert_allclose(result[name], getattr(expected, name)())
+    np.testing.assert_array_equal(result["argmin"], expected.idxmin())
+    np.testing.assert_array_equal(result["argmax"], expected.idxmax())
+
+
+def test_first_extreme_wins() -> None:
+    result = compute_stats(np.array([2.0, 1.0, 3.0, 1.0, 3.0]))
+    assert result["argmin"][0] == 1
+    assert result["argmax"][0] == 2
+
+
+def test_all_nan() -> None:
+    result = compute_stats(np.array([np.nan, np.nan]))
+    assert result["count"].size == 0
+    assert result["mean"].size == 0